@@ -1,331 +1,762 @@
 import pandas as pd
-import re
 import json
-from selenium import webdriver
+import re
+import requests
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
 import time
+import asyncio
 import logging
-import requests
-from bs4 import BeautifulSoup
+from browser_pool import BrowserPool
+from readiness import PageReadiness
+from page_weight import PageWeight
+from politeness import PolitenessScheduler
+from page_cache import PageCache
+from completion_cache import CompletionCache
+from generation_engine import AsyncGenerationEngine
+from batching import TokenBudgetBatcher
+from pipeline import ScrapeGeneratePipeline
+import resume_profile
+from extraction import ContentExtractor
+from parse_pool import ExtractionPool
+from condense import JobDescriptionCondenser
+from metrics import RunMetrics
+from tracing import span, tracer
+from journal import RunJournal
+from dedupe import NearDuplicateIndex
+from sinks import export_to_excel
+from http_client import OpenAIClient
+from streaming import CoverLetterStreamParser, iter_sse_events, chunk_text, format_marker, MARKER_RE
+from links import JobLinks
+import os
+from resume_profile import ResumeProfileStore
+from tokens import count_message_tokens, count_tokens
+from relevance import RelevanceScorer
+from fetchers import HttpFetcher, FetchStrategyRegistry, looks_like_js_shell, HTTP, BROWSER
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Job number at the end of a failed letter's error message
+FAILED_JOB_RE = re.compile(r'for job \d+$')
+
+def is_failed_letter(letter):
+    """Whether a generated letter is an error placeholder rather than a letter"""
+    return not letter or letter.startswith('Error')
+
+def renumber_failed_letter(letter, number):
+    """Point a failed letter's error message at the job's number in the whole batch"""
+    if not letter or not is_failed_letter(letter):
+        return letter
+    return FAILED_JOB_RE.sub(f'for job {number}', letter)
+
 class CoverLetterGenerator:
-    def __init__(self, resume_text, openai_api_key):
+    def __init__(self, resume_text, openai_api_key, num_browsers=1, host_policies=None,
+                 driver_factory=None, http_first=True, min_content_length=300,
+                 strategy_path=None, cache_dir='.page_cache', cache_ttl=7 * 24 * 3600,
+                 force_refresh=False, completion_cache_path='.completion_cache.sqlite',
+                 use_completion_cache=True, model='gpt-4', profile_dir='.profile_cache',
+                 api_base=None, api_pool_size=10, api_connect_timeout=5,
+                 api_read_timeout=45, api_max_retries=3, stream=False, repair_attempts=2,
+                 relevant_achievements=3, relevant_skills=12, job_token_budget=450,
+                 parse_workers=None, browser_profile='lean', politeness=True):
         self.resume = resume_text
         self.openai_api_key = openai_api_key
-        
-        # Set up Chrome options
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--start-maximized')
-        chrome_options.add_argument('--disable-notifications')
-        # chrome_options.add_argument('--headless')  # Uncomment for headless mode
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
+        self.model = model
+        self.stream = stream
+        # Follow-up requests allowed per batch for letters that failed to come back
+        self.repair_attempts = repair_attempts
+
+        # Shared keep-alive connection pool for the completion API; api_base defaults
+        # to OPENAI_BASE_URL, then the OpenAI endpoint
+        self.api_client = OpenAIClient(
+            openai_api_key, api_base=api_base, pool_size=api_pool_size,
+            connect_timeout=api_connect_timeout, read_timeout=api_read_timeout,
+            max_retries=api_max_retries
+        )
+        self.profile_store = ResumeProfileStore(cache_dir=profile_dir)
+        # Tokens, cost and latency of every completion request
+        self.metrics = RunMetrics()
+        # Per-job selection of the most relevant achievements and skills; None sends them all
+        self.relevant_achievements = relevant_achievements
+        self.relevant_skills = relevant_skills
+        self._relevance_scorer = None
+        # Postings are condensed to their requirement sentences within job_token_budget;
+        # None falls back to cutting the extracted text at a fixed length
+        self.extractor = ContentExtractor(
+            condenser=JobDescriptionCondenser(max_tokens=job_token_budget, model=model)
+            if job_token_budget else None
+        )
+        # Pages are parsed in worker processes so browser threads only drive browsers. By
+        # default one worker per browser, leaving a core for this process; 0 parses inline
+        if parse_workers is None:
+            parse_workers = min(num_browsers, (os.cpu_count() or 1) - 1)
+        self.parse_pool = ExtractionPool(self.extractor, workers=parse_workers)
+        # Page fetches are paced per job board instead of sleeping after every scrape
+        self.politeness = PolitenessScheduler(host_policies, enabled=politeness)
+
+        # Pool of headless browsers, started lazily on first checkout. The 'lean' profile
+        # skips images, media, fonts and trackers; 'full' loads pages as a user would
+        self.browser_pool = BrowserPool(size=num_browsers, driver_factory=driver_factory,
+                                        profile=browser_profile)
+        self.readiness = PageReadiness()
+        self.page_weight = PageWeight()
+
+        # Plain HTTP fast path, with per-domain memory of which fetcher works
+        self.http_first = http_first
+        self.min_content_length = min_content_length
+        self.http_fetcher = HttpFetcher(pool_size=max(10, num_browsers))
+        self.fetch_strategies = FetchStrategyRegistry(path=strategy_path)
+
+        # Scraped pages are cached on disk; force_refresh re-scrapes every URL
+        self.page_cache = PageCache(cache_dir=cache_dir, ttl=cache_ttl) if cache_dir else None
+        self.force_refresh = force_refresh
+
+        # Identical completion requests are answered from a local SQLite cache
+        self.completion_cache = (
+            CompletionCache(path=completion_cache_path, enabled=use_completion_cache)
+            if completion_cache_path else None
+        )
 
     def extract_professional_context(self):
         """
         Extract comprehensive professional context from resume
         """
         try:
-            # Extract key professional highlights
-            professional_summary = self.extract_professional_summary()
-            key_achievements = self.extract_key_achievements()
-            skill_matrix = self.create_skill_matrix()
-
-            return {
-                "professional_summary": professional_summary,
-                "key_achievements": key_achievements,
-                "skill_matrix": skill_matrix
-            }
+            # Built once per resume and reused across batches, processes and runs
+            return self.profile_store.get(self.resume)
         except Exception as e:
             logger.error(f"Error extracting professional context: {str(e)}")
             return {}
 
     def extract_professional_summary(self):
         """Extract a concise professional summary"""
-        # Use regex or NLP to identify key career moments
-        summary_match = re.search(r'(Professional Summary|Career Objective):(.*?)(?:\n\n|\Z)', 
-                                   self.resume, re.DOTALL | re.IGNORECASE)
-        return summary_match.group(2).strip() if summary_match else self.resume[:500]
+        return resume_profile.extract_professional_summary(self.resume)
 
     def extract_key_achievements(self):
         """Extract top 3-5 career achievements"""
-        # Look for achievement-oriented language
-        achievement_patterns = [
-            r'Achieved', r'Increased', r'Improved', r'Led', r'Developed',
-            r'Launched', r'Reduced', r'Optimized', r'Transformed'
-        ]
-        
-        achievements = []
-        for pattern in achievement_patterns:
-            matches = re.findall(f'{pattern}.*?(?:\n|$)', self.resume, re.IGNORECASE)
-            achievements.extend(matches[:3])
-        
-        return achievements[:5]
+        return resume_profile.extract_key_achievements(self.resume)
 
     def create_skill_matrix(self):
         """Create a structured skill matrix"""
-        # Extract skills using various patterns
-        skill_sections = [
-            r'Skills:(.*?)(?:\n\n|\Z)',
-            r'Technical Skills:(.*?)(?:\n\n|\Z)',
-            r'Professional Skills:(.*?)(?:\n\n|\Z)'
-        ]
-        
-        skills = {}
-        for section_pattern in skill_sections:
-            match = re.search(section_pattern, self.resume, re.DOTALL | re.IGNORECASE)
-            if match:
-                section_skills = re.findall(r'\b\w+\b', match.group(1))
-                skills.update({skill.lower(): True for skill in section_skills})
-        
-        return list(skills.keys())
+        return resume_profile.create_skill_matrix(self.resume)
+
+    def relevance_scorer(self):
+        """BM25 scorer for job postings against this resume's profile"""
+        if self._relevance_scorer is None:
+            self._relevance_scorer = RelevanceScorer(self.extract_professional_context())
+        return self._relevance_scorer
+
+    def relevance_scores(self, job_contents_list, corpus_idf=True):
+        """Fit of each posting to the resume, in [0, 1]"""
+        return self.relevance_scorer().scores(job_contents_list, corpus_idf=corpus_idf)
 
-    def extract_page_content(self, html_content):
+    def extract_page_content(self, html_content, url=None):
         """Enhanced precise job description content extraction"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        with span('extract', url=url):
+            return self.parse_pool.extract(html_content, url)
+
+    def build_messages(self, job_contents_list, professional_context=None):
+        """Build the chat messages for a batch of job postings"""
+        if professional_context is None:
+            # Extract comprehensive professional context
+            professional_context = self.extract_professional_context()
+        professional_context = dict(professional_context)
+        professional_context.pop('achievement_candidates', None)
+
+        job_details = [f'JOB {i+1} DETAILS: {content}' for i, content in enumerate(job_contents_list)]
+        if self.relevant_achievements:
+            # Send each job only the achievements and skills that match it
+            professional_context.pop('key_achievements', None)
+            professional_context.pop('skill_matrix', None)
+            selections = self.relevance_scorer().select(
+                job_contents_list, top_achievements=self.relevant_achievements,
+                top_skills=self.relevant_skills or 0
+            )
+            job_details = [
+                f"{details} MOST RELEVANT CANDIDATE EVIDENCE: "
+                f"{json.dumps({key: selection[key] for key in ('key_achievements', 'skill_matrix')})}"
+                for details, selection in zip(job_details, selections)
+            ]
         
-        # Remove unwanted elements
-        for unwanted in soup.find_all(['script', 'style', 'nav', 'footer', 'header']):
-            unwanted.decompose()
-
-        # Advanced selector strategy
-        selectors = [
-            '.jobs-description-content__text',
-            '.description__text',
-            '.greenhouse-job-description',
-            '.job-description',
-            '#job-description',
-            '[data-testid="job-description"]',
-            'main', 
-            'article', 
-            'div[class*="content"]', 
-            'div[class*="description"]'
+        # Construct strategic prompt
+        prompt = (
+            "You are an elite career strategist crafting transformative career narratives. "
+            "Your goal is to create highly personalized, impactful cover letters. "
+            
+            f"COMPREHENSIVE PROFESSIONAL PROFILE: {json.dumps(professional_context, indent=2)} "
+            
+            "CRITICAL EVALUATION CRITERIA: "
+            "1. Demonstrate profound understanding of professional journey. "
+            "2. Highlight most relevant experiences for each specific role. "
+            "3. Create a narrative that proves candidacy. "
+            "4. Maintain a tone reflecting unique professional brand. "
+            "5. Include specific, quantifiable achievements. "
+            
+            f"JOB POSTINGS TO ANALYZE: {' '.join(job_details)} "
+            
+            "COVER LETTER GUIDELINES: "
+            "- Open with a compelling, role-specific hook "
+            "- Demonstrate deep understanding of company and role "
+            "- Connect 2-3 specific career achievements directly to requirements "
+            "- Close with a forward-looking, confident statement "
+            
+            "FORMAT INSTRUCTIONS: "
+            "Provide cover letters marked as: ### COVER LETTER FOR JOB {number} ### "
+            "Ensure each letter is highly tailored and achievement-driven."
+        )
+
+        return [
+            {"role": "system", "content": "You are an elite career strategist who crafts transformative career narratives."},
+            {"role": "user", "content": prompt}
         ]
 
-        for selector in selectors:
-            elements = soup.select(selector)
-            if elements:
-                # Combine and score paragraphs
-                paragraphs = []
-                for element in elements:
-                    paras = element.find_all(['p', 'li'])
-                    scored_paras = [
-                        (p.get_text(strip=True), len(p.get_text(strip=True).split())) 
-                        for p in paras
-                    ]
-                    # Sort by paragraph length, take top paragraphs
-                    paragraphs.extend(
-                        [p[0] for p in sorted(scored_paras, key=lambda x: x[1], reverse=True)[:5]]
-                    )
-                
-                # Combine and clean
-                content = ' '.join(paragraphs)
-                return ' '.join(content.split())[:2500]
-        
-        # Ultimate fallback
-        return ' '.join(soup.get_text(strip=True).split())[:2000]
+    def make_batcher(self, max_jobs_per_batch=None):
+        """Token budget batcher sized for this generator's model and prompt"""
+        return TokenBudgetBatcher(
+            model=self.model,
+            base_prompt_tokens=count_message_tokens(self.build_messages([]), self.model),
+            job_overhead_tokens=8 + self.evidence_tokens(),
+            max_jobs_per_batch=max_jobs_per_batch
+        )
+
+    def evidence_tokens(self):
+        """Upper bound on the per-job achievements and skills added to the prompt
+
+        Counted for the achievements and skills that take the most tokens, so
+        whichever ones a job is sent, its evidence is no longer than this.
+        """
+        if not self.relevant_achievements:
+            return 0
+        scorer = self.relevance_scorer()
+
+        def longest(items, count):
+            return sorted(items, key=lambda item: count_tokens(json.dumps(item), self.model), reverse=True)[:count]
+
+        evidence = {'key_achievements': longest(scorer.achievements, self.relevant_achievements),
+                    'skill_matrix': longest(scorer.skills, self.relevant_skills or 0)}
+        return count_tokens(f" MOST RELEVANT CANDIDATE EVIDENCE: {json.dumps(evidence)}", self.model)
+
+    def generate_multiple_cover_letters(self, job_contents_list, on_letter=None, labels=None):
+        """Strategic, context-rich cover letter generation
+
+        Letters that fail (missing marker, empty letter, failed request) are
+        re-requested on their own in smaller follow-up calls, up to
+        repair_attempts times, so one broken letter does not cost the batch.
+        Follow-up calls always go to the API rather than the completion cache.
+
+        on_letter(position, letter) is called once per job as its final letter
+        becomes available, which with streaming enabled is as soon as its
+        closing marker arrives. labels (usually URLs) name the jobs in the
+        per-job metrics.
+        """
+        with span('generate', jobs=len(job_contents_list)):
+            return self._generate_with_repair(job_contents_list, on_letter, labels)
+
+    def _generate_with_repair(self, job_contents_list, on_letter=None, labels=None):
+        delivered = set()
+
+        def deliver(positions):
+            # Hand good letters over immediately; failures wait for the repair pass
+            def callback(index, letter):
+                position = positions[index]
+                cover_letters[position] = letter
+                if on_letter and not is_failed_letter(letter) and position not in delivered:
+                    delivered.add(position)
+                    on_letter(position, letter)
+            return callback
+
+        cover_letters = [None] * len(job_contents_list)
+        positions = list(range(len(job_contents_list)))
+        for attempt in range(self.repair_attempts + 1):
+            if attempt:
+                logger.info(f"Repair attempt {attempt}: re-requesting {len(positions)} of "
+                            f"{len(job_contents_list)} cover letters")
+            letters = self._request_cover_letters([job_contents_list[p] for p in positions],
+                                                  on_letter=deliver(positions), refresh=bool(attempt),
+                                                  labels=[labels[p] for p in positions] if labels else None)
+            for position, letter in zip(positions, letters):
+                # Follow-up calls number their jobs from 1; report the job's original number
+                cover_letters[position] = renumber_failed_letter(letter, position + 1)
+            positions = [p for p in positions if is_failed_letter(cover_letters[p])]
+            if not positions:
+                break
+
+        if positions:
+            logger.warning(f"{len(positions)} cover letters still failed after "
+                           f"{self.repair_attempts} repair attempts")
+        if on_letter:
+            for position, letter in enumerate(cover_letters):
+                if position not in delivered:
+                    on_letter(position, letter)
+        return cover_letters
 
-    def generate_multiple_cover_letters(self, job_contents_list):
-        """Strategic, context-rich cover letter generation"""
+    def _request_cover_letters(self, job_contents_list, on_letter=None, refresh=False, labels=None):
+        """Generate letters for a list of jobs with a single completion request
+
+        refresh skips the completion cache lookup, sending the request to the API.
+        """
+        request = {}
+        prompt_tokens = 0
+        start = time.monotonic()
         try:
-            # Extract comprehensive professional context
-            professional_context = self.extract_professional_context()
-            
-            # Construct strategic prompt
-            prompt = (
-                "You are an elite career strategist crafting transformative career narratives. "
-                "Your goal is to create highly personalized, impactful cover letters. "
-                
-                f"COMPREHENSIVE PROFESSIONAL PROFILE: {json.dumps(professional_context, indent=2)} "
-                
-                "CRITICAL EVALUATION CRITERIA: "
-                "1. Demonstrate profound understanding of professional journey. "
-                "2. Highlight most relevant experiences for each specific role. "
-                "3. Create a narrative that proves candidacy. "
-                "4. Maintain a tone reflecting unique professional brand. "
-                "5. Include specific, quantifiable achievements. "
-                
-                f"JOB POSTINGS TO ANALYZE: {' '.join([f'JOB {i+1} DETAILS: {content}' for i, content in enumerate(job_contents_list)])} "
-                
-                "COVER LETTER GUIDELINES: "
-                "- Open with a compelling, role-specific hook "
-                "- Demonstrate deep understanding of company and role "
-                "- Connect 2-3 specific career achievements directly to requirements "
-                "- Close with a forward-looking, confident statement "
-                
-                "FORMAT INSTRUCTIONS: "
-                "Provide cover letters marked as: ### COVER LETTER FOR JOB {number} ### "
-                "Ensure each letter is highly tailored and achievement-driven."
-            )
+            with span('generate.build_messages'):
+                messages = self.build_messages(job_contents_list)
+
+            # Size the completion to whatever the prompt leaves of the context window
+            prompt_tokens = count_message_tokens(messages, self.model)
+            max_tokens = TokenBudgetBatcher(model=self.model).completion_budget(prompt_tokens)
 
             # API request configuration
             api_data = {
-                "model": "gpt-4",
-                "messages": [
-                    {"role": "system", "content": "You are an elite career strategist who crafts transformative career narratives."},
-                    {"role": "user", "content": prompt}
-                ],
+                "model": self.model,
+                "messages": messages,
                 "temperature": 0.7,
-                "max_tokens": 4000
+                "max_tokens": max_tokens
             }
 
-            # Send API request
-            logger.info("Sending strategic cover letter generation request")
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.openai_api_key}"
-                },
-                json=api_data,
-                timeout=45
-            )
-            
-            response.raise_for_status()
-            
-            # Parse and extract cover letters
-            full_response = response.json()['choices'][0]['message']['content'].strip()
-            
-            cover_letters = []
-            for i in range(len(job_contents_list)):
-                current_marker = f"### COVER LETTER FOR JOB {i+1} ###"
-                next_marker = f"### COVER LETTER FOR JOB {i+2} ###" if i < len(job_contents_list)-1 else None
-                
-                start = full_response.find(current_marker)
-                if start == -1:
-                    logger.warning(f"Marker not found for job {i+1}")
-                    cover_letters.append(f"Error: Could not find cover letter for job {i+1}")
-                    continue
-                
-                start += len(current_marker)
-                end = full_response.find(next_marker) if next_marker else None
+            if self.stream:
+                with span('generate.stream', jobs=len(job_contents_list)):
+                    cover_letters = self.stream_cover_letters(api_data, len(job_contents_list), on_letter, request,
+                                                             refresh=refresh)
+            else:
+                # Send API request
+                with span('generate.request', jobs=len(job_contents_list)):
+                    response_json = self.request_completion(api_data, request, refresh=refresh)
                 
-                letter = full_response[start:end].strip() if end else full_response[start:].strip()
-                cover_letters.append(letter if letter else f"Error: Empty cover letter for job {i+1}")
+                # Parse and extract cover letters
+                with span('generate.parse'):
+                    full_response = response_json['choices'][0]['message']['content'].strip()
+                    cover_letters = self.parse_cover_letters(full_response, len(job_contents_list))
+                if not request.get('cached'):
+                    self.cache_completion(api_data, response_json, cover_letters)
+                if on_letter:
+                    for position, letter in enumerate(cover_letters):
+                        on_letter(position, letter)
             
             logger.info(f"Successfully generated {len(cover_letters)} strategic cover letters")
+            self.metrics.record_request(self.model, job_contents_list, cover_letters, prompt_tokens,
+                                        time.monotonic() - start, labels=labels, **request)
             return cover_letters
 
         except Exception as e:
             logger.error(f"Unexpected error in strategic cover letter generation: {str(e)}")
-            return ["Error: Unexpected error in generation"] * len(job_contents_list)
+            cover_letters = ["Error: Unexpected error in generation"] * len(job_contents_list)
+            request['error'] = str(e)
+            self.metrics.record_request(self.model, job_contents_list, cover_letters, prompt_tokens,
+                                        time.monotonic() - start, labels=labels, **request)
+            return cover_letters
+
+    def parse_cover_letters(self, full_response, count):
+        """Split a full completion into letters using the job markers
+
+        Each letter runs to whichever marker comes next, so a dropped marker
+        only loses its own letter instead of corrupting its neighbour.
+        """
+        markers = list(MARKER_RE.finditer(full_response))
+        sections = {}
+        for marker, following in zip(markers, markers[1:] + [None]):
+            end = following.start() if following else len(full_response)
+            sections.setdefault(int(marker.group(1)), full_response[marker.end():end].strip())
+
+        cover_letters = []
+        for i in range(count):
+            if i + 1 not in sections:
+                logger.warning(f"Marker not found for job {i+1}")
+                cover_letters.append(f"Error: Could not find cover letter for job {i+1}")
+                continue
+            letter = sections[i + 1]
+            cover_letters.append(letter if letter else f"Error: Empty cover letter for job {i+1}")
+        return cover_letters
+
+    def stream_cover_letters(self, api_data, count, on_letter=None, request=None, refresh=False):
+        """Stream a completion, handing over each letter as soon as it is closed
+
+        Letters finished before a stream is cut off are kept; the one being
+        written when it was cut off and the ones that never arrived come back
+        as errors, for the repair pass to re-request. A stream that closes
+        without [DONE] or a finish_reason counts as cut off. Usage and cache details are
+        recorded in the optional request dict; refresh skips the cache lookup.
+        """
+        request = request if request is not None else {}
+        request['streamed'] = True
+        if self.completion_cache and not refresh:
+            cached = self.completion_cache.get(api_data)
+            if cached is not None:
+                logger.info("Using cached cover letter generation response")
+                request.update(cached=True, usage=cached.get('usage'))
+                full_response = cached['choices'][0]['message']['content'].strip()
+                cover_letters = self.parse_cover_letters(full_response, count)
+                if on_letter:
+                    for position, letter in enumerate(cover_letters):
+                        on_letter(position, letter)
+                return cover_letters
+
+        cover_letters = [None] * count
+        parser = CoverLetterStreamParser()
+        start = time.monotonic()
+
+        def deliver(number, letter):
+            if not 1 <= number <= count or cover_letters[number - 1] is not None:
+                logger.warning(f"Ignoring unexpected streamed letter for job {number}")
+                return
+            if all(existing is None for existing in cover_letters):
+                logger.info(f"First streamed letter after {time.monotonic() - start:.2f}s")
+            cover_letters[number - 1] = letter or f"Error: Empty cover letter for job {number}"
+            if on_letter:
+                on_letter(number - 1, cover_letters[number - 1])
+
+        complete = False
+        response = None
+        try:
+            logger.info("Streaming strategic cover letter generation request")
+            response = self.api_client.chat_completion(
+                dict(api_data, stream=True, stream_options={'include_usage': True}), stream=True
+            )
+            # Accepted, so the API bills this request even if the stream is cut off
+            request['generation_started'] = True
+            for event in iter_sse_events(response):
+                if event.get('usage'):
+                    # Sent in a final chunk without choices
+                    request['usage'] = event['usage']
+                for number, letter in parser.feed(chunk_text(event)):
+                    deliver(number, letter)
+            for number, letter in parser.finish():
+                deliver(number, letter)
+            complete = True
+        except Exception as e:
+            received = sum(letter is not None for letter in cover_letters)
+            logger.error(f"Stream interrupted after {received} of {count} letters: {str(e)}")
+            request['error'] = f"Stream interrupted: {str(e)}"
+        finally:
+            if response is not None:
+                response.close()
+
+        if complete and all(letter is not None for letter in cover_letters):
+            # Cache the reassembled text so reruns can be answered without streaming
+            content = '\n\n'.join(f"{format_marker(i + 1)}\n{letter}" for i, letter in enumerate(cover_letters))
+            self.cache_completion(api_data, {
+                'choices': [{'message': {'role': 'assistant', 'content': content}}],
+                'usage': request.get('usage')
+            }, cover_letters)
+
+        for i, letter in enumerate(cover_letters):
+            if letter is None:
+                reason = "Could not find" if complete else "Stream interrupted before"
+                logger.warning(f"{reason} cover letter for job {i+1}")
+                cover_letters[i] = f"Error: {reason} cover letter for job {i+1}"
+        return cover_letters
         
-    def scrape_job_content(self, url):
+    async def agenerate_multiple_cover_letters(self, job_contents_list):
+        """Async counterpart of generate_multiple_cover_letters"""
+        return await asyncio.to_thread(self.generate_multiple_cover_letters, job_contents_list)
+
+    async def agenerate_batches(self, batches, max_in_flight=4):
+        """Generate letters for many batches with bounded concurrency"""
+        engine = AsyncGenerationEngine(self, max_in_flight=max_in_flight)
+        return await engine.generate_batches(batches)
+
+    def request_completion(self, api_data, request=None, refresh=False):
+        """Send a chat completion request, answering repeats from the cache
+
+        Usage and cache details are recorded in the optional request dict;
+        refresh skips the cache lookup. The response is not cached here; callers store it with
+        cache_completion once its letters have parsed.
+        """
+        request = request if request is not None else {}
+        if self.completion_cache and not refresh:
+            cached = self.completion_cache.get(api_data)
+            if cached is not None:
+                logger.info("Using cached cover letter generation response")
+                request.update(cached=True, usage=cached.get('usage'))
+                return cached
+
+        logger.info("Sending strategic cover letter generation request")
+        try:
+            response = self.api_client.chat_completion(api_data)
+        except (requests.exceptions.ReadTimeout, requests.exceptions.ChunkedEncodingError):
+            # The request was sent and may already be generating, which is billed
+            request['generation_started'] = True
+            raise
+        request['generation_started'] = True
+        response_json = response.json()
+        request['usage'] = response_json.get('usage')
+        return response_json
+
+    def cache_completion(self, api_data, response_json, cover_letters):
+        """Cache a response only if every letter parsed from it is usable
+
+        A response with a missing marker or empty letter would otherwise be
+        served again on every rerun of the same batch.
+        """
+        if not self.completion_cache:
+            return
+        if any(is_failed_letter(letter) for letter in cover_letters):
+            logger.info("Not caching a response with missing or empty cover letters")
+            return
+        self.completion_cache.put(api_data, response_json)
+
+    def scrape_job_content(self, url, max_attempts=2, refresh=None):
         """Scrape job content from a given URL"""
+        text_content, _ = self._scrape(url, max_attempts, refresh)
+        return text_content
+
+    def _scrape(self, url, max_attempts=2, refresh=None):
+        """Scrape a URL, returning its content and whether it came from the cache"""
+        with span('scrape', url=url):
+            return self._scrape_page(url, max_attempts, refresh)
+
+    def _scrape_page(self, url, max_attempts=2, refresh=None):
+        refresh = self.force_refresh if refresh is None else refresh
+        if self.page_cache and not refresh:
+            with span('scrape.page_cache'):
+                entry = self.page_cache.get(url)
+            if entry:
+                logger.info(f"Using cached content for: {url}")
+                # Re-extract from the cached page so extraction settings apply to old entries
+                if entry.get('html'):
+                    return self.extract_page_content(entry['html'], url), True
+                return entry['text'], True
+
+        # Try a plain HTTP fetch unless this domain is known to need a browser
+        if self.http_first and self.fetch_strategies.get(url) != BROWSER:
+            page = self._scrape_over_http(url)
+            if page:
+                html_content, text_content = page
+                self.fetch_strategies.record(url, HTTP)
+                self._cache_page(url, html_content, text_content)
+                logger.info(f"Successfully scraped content over HTTP from: {url}")
+                return text_content, False
+
+        for attempt in range(1, max_attempts + 1):
+            try:
+                # Wait for the host's turn before taking a browser, so none sits idle meanwhile
+                with self.politeness.slot(url), self.browser_pool.checkout() as driver:
+                    html_content = self._scrape_with_driver(driver, url)
+                # The browser is back in the pool while this page is parsed
+                text_content = self.extract_page_content(html_content, url).strip()
+                if not text_content:
+                    # The extractor already falls back to the body text, so the page rendered empty
+                    if attempt < max_attempts:
+                        logger.warning(f"No content extracted from {url}, retrying")
+                        continue
+                    logger.error(f"Error scraping {url}: no content extracted")
+                    break
+                if self.http_first:
+                    self.fetch_strategies.record(url, BROWSER)
+                self._cache_page(url, html_content, text_content)
+                logger.info(f"Successfully scraped content from: {url}")
+                return text_content, False
+
+            except WebDriverException as e:
+                # The pool replaces a dead browser, so a retry gets a fresh one
+                if attempt < max_attempts:
+                    logger.warning(f"Browser error scraping {url}, retrying: {str(e)}")
+                    continue
+                logger.error(f"Error scraping {url}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error scraping {url}: {str(e)}")
+                break
+
+        return "Error scraping job content", False
+
+    def _cache_page(self, url, html_content, text_content):
+        """Store a successfully scraped page in the cache"""
+        if not self.page_cache or not text_content:
+            return
         try:
-            # Navigate to the URL
-            self.driver.get(url)
-            time.sleep(3)  # Allow page to load
-            
-            # Platform-specific preprocessing for known sites
-            if 'linkedin.com' in url:
-                # Scroll to expand full description
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-                time.sleep(1)
-            elif 'greenhouse.io' in url:
-                # Click "Show more" if exists
-                try:
-                    show_more = self.driver.find_elements(By.XPATH, "//a[contains(text(), 'Show more')]")
-                    if show_more:
-                        show_more[0].click()
-                        time.sleep(1)
-                except:
-                    pass
-            
-            # Get the page source after JavaScript rendering
-            page_source = self.driver.page_source
-            
-            # Extract text content
-            text_content = self.extract_page_content(page_source)
-            
-            # Final fallback
-            if not text_content:
-                text_content = self.driver.find_element(By.TAG_NAME, 'body').text
-            
-            logger.info(f"Successfully scraped content from: {url}")
-            return text_content.strip()
+            self.page_cache.put(url, html_content, text_content)
+        except Exception as e:
+            logger.warning(f"Could not cache {url}: {str(e)}")
+
+    def _scrape_over_http(self, url):
+        """Fetch a page without a browser, or return None if it needs one
 
+        Returns a (raw HTML, extracted text) pair on success.
+        """
+        try:
+            with self.politeness.slot(url), span('scrape.http_fetch', url=url):
+                html_content = self.http_fetcher.fetch(url)
         except Exception as e:
-            logger.error(f"Error scraping {url}: {str(e)}")
-            return "Error scraping job content"
+            logger.info(f"HTTP fetch failed for {url}, falling back to browser: {str(e)}")
+            return None
+
+        if looks_like_js_shell(html_content):
+            logger.info(f"JavaScript shell detected for {url}, falling back to browser")
+            return None
+
+        text_content = self.extract_page_content(html_content, url).strip()
+        if len(text_content) < self.min_content_length:
+            logger.info(f"Too little content over HTTP for {url}, falling back to browser")
+            return None
+        return html_content, text_content
+
+    def _scrape_with_driver(self, driver, url):
+        """Load a URL in the given browser, returning its rendered HTML"""
+        # Navigate to the URL and wait until the description has rendered
+        with span('scrape.driver_get', url=url):
+            driver.get(url)
+        with span('scrape.readiness_wait'):
+            self.readiness.wait(driver, url)
+        
+        # Platform-specific preprocessing for known sites
+        if 'linkedin.com' in url:
+            # Scroll to expand full description
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+            with span('scrape.settle'):
+                self.readiness.settle(driver)
+        elif 'greenhouse.io' in url:
+            # Click "Show more" if exists
+            try:
+                show_more = driver.find_elements(By.XPATH, "//a[contains(text(), 'Show more')]")
+                if show_more:
+                    show_more[0].click()
+                    with span('scrape.settle'):
+                        self.readiness.settle(driver)
+            except:
+                pass
+        
+        # Bytes and time the browser spent on this page
+        with span('scrape.page_weight'):
+            self.page_weight.measure(driver, url)
+
+        # Get the page source after JavaScript rendering
+        with span('scrape.page_source'):
+            return driver.page_source
+
+    def scrape_job_contents(self, urls):
+        """Scrape several URLs across the browser pool, keeping input order
+
+        Threads waiting on the parse pool have returned their browser, so
+        there is one extra thread per parse worker to keep every browser busy.
+        URLs are handed out alternating between hosts, so workers are not all
+        left waiting on one host's politeness interval.
+        """
+        urls = list(urls)
+        order = self.politeness.interleave(urls)
+        contents = self.browser_pool.map(self.scrape_job_content, [urls[i] for i in order],
+                                         workers=self.scrape_threads())
+        ordered = [None] * len(urls)
+        for index, content in zip(order, contents):
+            ordered[index] = content
+        return ordered
+
+    def scrape_threads(self):
+        """Threads needed to keep every browser and parse worker busy"""
+        return self.browser_pool.size + self.parse_pool.workers
+
+    def process_job_links(self, excel_path, output_path, batch_size=None, max_in_flight=4,
+                          journal_path=None, resume=False, sinks=None, export_excel=True,
+                          dedupe_threshold=0.9, min_relevance=None, metrics_path=None,
+                          trace_path=None, profile_path=None):
+        """Process job links, overlapping scraping with batched generation
 
-    def process_job_links(self, excel_path, output_path, batch_size=5):
-        """Process job links in optimal batch sizes"""
+        Every finished job is appended to a JSONL journal (by default next to
+        output_path) and to any extra result sinks as soon as its batch
+        completes. With resume=True, jobs already completed in the journal
+        are taken from it instead of being scraped and generated again.
+        The Excel workbook at output_path is an export written at the end,
+        skipped when export_excel is False.
+
+        Postings whose scraped content is at least dedupe_threshold similar
+        (estimated Jaccard over word shingles) to an earlier posting, and
+        use the same words apart from numbers, reuse its letter instead of
+        being generated again; None disables this.
+        Postings scoring below min_relevance against the resume profile are
+        recorded as skipped without a letter.
+
+        Token, cost and latency metrics per request and per job are logged
+        and saved as JSON to metrics_path (by default next to output_path).
+        Per-stage timings are logged with p50/p95/p99 and saved as a Chrome
+        trace to trace_path (likewise by default); with profile_path, the
+        run is also profiled with cProfile and the merged stats saved there.
+        """
+        self.metrics = RunMetrics()
+        tracer.reset(profile=bool(profile_path))
         try:
-            df = pd.read_excel(excel_path)
-            results = []
-            
-            # Calculate optimal batch size based on total jobs
+            with span('process_job_links'):
+                return self._process_job_links(excel_path, output_path, batch_size, max_in_flight,
+                                               journal_path, resume, sinks, export_excel,
+                                               dedupe_threshold, min_relevance, metrics_path)
+        finally:
+            tracer.log_summary()
+            tracer.export_chrome_trace(trace_path or os.path.splitext(output_path)[0] + '.trace.json')
+            if profile_path:
+                tracer.dump_profile(profile_path)
+                tracer.reset(profile=False)
+
+    def _process_job_links(self, excel_path, output_path, batch_size, max_in_flight, journal_path,
+                           resume, sinks, export_excel, dedupe_threshold, min_relevance, metrics_path):
+        journal = None
+        try:
+            with span('process_job_links.read_excel'):
+                df = pd.read_excel(excel_path)
             total_jobs = len(df)
-            if total_jobs > 5:
-                logger.info("Large number of jobs detected, processing in smaller batches")
-                batch_size = 5  # Maximum 5 jobs per batch to stay within context window
-            
-            # Process jobs in batches
-            for i in range(0, total_jobs, batch_size):
-                batch_df = df[i:i+batch_size]
-                current_batch_size = len(batch_df)
-                logger.info(f"Processing batch {i//batch_size + 1} of {(total_jobs + batch_size - 1)//batch_size}")
-                logger.info(f"Batch size: {current_batch_size} jobs")
-                
-                # Scrape content for all jobs in batch
-                job_contents = []
-                job_urls = []
-                for _, row in batch_df.iterrows():
-                    url = row['job_link']
-                    content = self.scrape_job_content(url)
-                    job_contents.append(content)
-                    job_urls.append(url)
-                    time.sleep(2)  # Delay between scraping
-                
-                try:
-                    # Generate cover letters for batch
-                    cover_letters = self.generate_multiple_cover_letters(job_contents)
-                    
-                    # Store results
-                    for url, content, letter in zip(job_urls, job_contents, cover_letters):
-                        results.append({
-                            'job_link': url,
-                            'job_content': content,
-                            'cover_letter': letter
-                        })
-                    
-                    # Optional delay between batches if processing multiple batches
-                    if i + batch_size < len(df):
-                        time.sleep(5)
-                
-                except Exception as e:
-                    logger.error(f"Error processing batch: {str(e)}")
-                    # Add error entries for this batch
-                    for url, content in zip(job_urls, job_contents):
-                        results.append({
-                            'job_link': url,
-                            'job_content': content,
-                            'cover_letter': "Error generating cover letter"
-                        })
+            job_urls = df['job_link'].tolist()
+
+            journal = RunJournal(journal_path or os.path.splitext(output_path)[0] + '.journal.jsonl')
+            completed = journal.completed() if resume else {}
+            pending_urls = [url for url in job_urls if JobLinks.clean_url(url) not in completed]
+            if resume:
+                logger.info(f"Resuming: {total_jobs - len(pending_urls)} jobs already done, "
+                            f"{len(pending_urls)} remaining (journal: {journal.path})")
+
+            # Stream scraped jobs into token-budget batches while earlier batches generate
+            batcher = self.make_batcher(max_jobs_per_batch=batch_size)
+            pipeline = ScrapeGeneratePipeline(self, batcher, max_in_flight=max_in_flight,
+                                              sinks=[journal] + list(sinks or []),
+                                              dedupe=NearDuplicateIndex(threshold=dedupe_threshold)
+                                              if dedupe_threshold else None,
+                                              min_relevance=min_relevance)
+            logger.info(f"Processing {len(pending_urls)} jobs with up to {max_in_flight} requests in flight")
+            with span('process_job_links.pipeline', jobs=len(pending_urls)):
+                new_results = iter(pipeline.run(pending_urls))
+
+            # Merge journaled and new results back into input order
+            results = []
+            for url in job_urls:
+                record = completed.get(JobLinks.clean_url(url))
+                if record:
+                    results.append({key: record[key] for key in ('job_link', 'job_content', 'cover_letter')})
+                else:
+                    results.append(next(new_results))
             
-            # Save results
-            results_df = pd.DataFrame(results)
-            results_df.to_excel(output_path, index=False)
-            logger.info(f"Results saved to {output_path}")
+            # Log how long pages took to become ready on each platform
+            self.readiness.log_summary()
+            self.page_weight.log_summary()
+            self.politeness.log_summary()
+            if self.page_cache:
+                logger.info(f"Page cache: {self.page_cache.hits} hits, {self.page_cache.misses} misses")
+            if self.completion_cache:
+                stats = self.completion_cache.stats()
+                logger.info(f"Completion cache: {stats['hits']} hits, {stats['misses']} misses")
+            self.metrics.log_summary()
+            self.metrics.export(metrics_path or os.path.splitext(output_path)[0] + '.metrics.json')
+
+            # Export results to Excel once everything has been streamed to the sinks
+            if export_excel:
+                with span('process_job_links.export_excel'):
+                    export_to_excel(results, output_path, latest_only=False)
             
             # Log summary
             success_count = len([r for r in results if not r['cover_letter'].startswith("Error")])
             logger.info(f"Successfully generated {success_count} out of {len(df)} cover letters")
             
+            return results
+            
         except Exception as e:
             logger.error(f"Error in process_job_links: {str(e)}")
             raise
+        finally:
+            for sink in ([journal] if journal else []) + list(sinks or []):
+                sink.close()
 
     def __del__(self):
-        """Clean up browser instance"""
+        """Clean up browser instances"""
         try:
-            self.driver.quit()
+            self.browser_pool.close()
+            self.parse_pool.close()
+            self.http_fetcher.close()
+            self.api_client.close()
         except:
             pass
\ No newline at end of file
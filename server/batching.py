@@ -0,0 +1,74 @@
+# batching.py
+import logging
+from typing import List, Optional
+
+from tokens import count_tokens, model_limits, truncate_to_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TokenBudgetBatcher:
+    """Packs jobs into completion requests up to a model's context and output budget"""
+
+    def __init__(self, model: str = 'gpt-4', base_prompt_tokens: int = 0,
+                 tokens_per_letter: int = 450, job_overhead_tokens: int = 8,
+                 max_jobs_per_batch: Optional[int] = None, safety_margin: float = 0.05):
+        limits = model_limits(model)
+        self.model = model
+        self.context_window = limits['context']
+        self.max_output = limits['max_output']
+        self.context_budget = int(self.context_window * (1 - safety_margin))
+        self.base_prompt_tokens = base_prompt_tokens
+        self.tokens_per_letter = tokens_per_letter
+        self.job_overhead_tokens = job_overhead_tokens
+
+        # Never ask for more letters than fit in one completion
+        max_letters = max(1, self.max_output // tokens_per_letter)
+        self.max_jobs_per_batch = min(max_jobs_per_batch or max_letters, max_letters)
+
+    @property
+    def max_job_tokens(self) -> int:
+        """Largest job that still fits in a request on its own"""
+        return (self.context_budget - self.base_prompt_tokens
+                - self.tokens_per_letter - self.job_overhead_tokens)
+
+    def job_tokens(self, content: str) -> int:
+        """Prompt tokens a job adds to a request"""
+        return count_tokens(content, self.model) + self.job_overhead_tokens
+
+    def fit(self, content: str) -> str:
+        """Truncate a job that would not fit in a request by itself"""
+        if count_tokens(content, self.model) <= self.max_job_tokens:
+            return content
+        logger.warning(f"Job content exceeds {self.max_job_tokens} tokens, truncating")
+        return truncate_to_tokens(content, self.max_job_tokens, self.model)
+
+    def batch_tokens(self, job_tokens: List[int]) -> int:
+        """Prompt plus expected completion tokens for a batch"""
+        return (self.base_prompt_tokens + sum(job_tokens)
+                + len(job_tokens) * self.tokens_per_letter)
+
+    def fits(self, job_tokens: List[int], next_job_tokens: int) -> bool:
+        """Whether one more job can join a batch"""
+        if len(job_tokens) >= self.max_jobs_per_batch:
+            return False
+        return self.batch_tokens(job_tokens + [next_job_tokens]) <= self.context_budget
+
+    def pack(self, contents: List[str]) -> List[List[int]]:
+        """Split job indices into consecutive batches that fit the budget"""
+        batches, current, current_tokens = [], [], []
+        for index, content in enumerate(contents):
+            tokens = self.job_tokens(content)
+            if current and not self.fits(current_tokens, tokens):
+                batches.append(current)
+                current, current_tokens = [], []
+            current.append(index)
+            current_tokens.append(tokens)
+        if current:
+            batches.append(current)
+        return batches
+
+    def completion_budget(self, prompt_tokens: int) -> int:
+        """max_tokens for a request whose prompt has prompt_tokens tokens"""
+        return max(1, min(self.max_output, self.context_window - prompt_tokens - 16))
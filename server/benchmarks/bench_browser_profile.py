@@ -0,0 +1,160 @@
+# bench_browser_profile.py
+"""Compare bytes and time per page of the full and lean browser profiles
+
+Loads the saved job board pages from benchmarks/fixtures with the images,
+web fonts, video and tracker scripts a live posting carries, served from a
+local HTTP server with a delay per asset. Tracker hosts are mapped to the
+same server with --host-resolver-rules, so they are blocked by the lean
+profile's real patterns. Needs Chrome and chromedriver:
+
+    python benchmarks/bench_browser_profile.py --rounds 3
+    python benchmarks/bench_browser_profile.py --url https://boards.greenhouse.io/...
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+from bench_suite import load_fixtures  # noqa: E402
+from browser_pool import (default_chrome_options, default_driver_factory,  # noqa: E402
+                          lean_chrome_options, lean_driver_factory)
+from page_weight import PageWeight  # noqa: E402
+from readiness import PageReadiness  # noqa: E402
+
+TRACKER_SCRIPTS = ['sb.scorecardresearch.com/beacon.js', 'secure.quantserve.com/quant.js']
+ASSET_BYTES = {'png': 80_000, 'jpg': 120_000, 'woff2': 45_000, 'mp4': 400_000, 'js': 35_000}
+ASSET_TYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'woff2': 'font/woff2',
+               'mp4': 'video/mp4', 'js': 'application/javascript'}
+
+
+def page_assets() -> str:
+    """Markup for the assets a typical job page pulls in alongside its description"""
+    images = ''.join(f'<img src="/assets/photo{i}.jpg" width="400"><img src="/assets/logo{i}.png">'
+                     for i in range(4))
+    trackers = ''.join(f'<script src="http://{script}"></script>' for script in TRACKER_SCRIPTS)
+    return (
+        '<style>@font-face { font-family: Brand; src: url(/assets/brand.woff2) format("woff2"); }'
+        '@font-face { font-family: BrandBold; src: url(/assets/brand-bold.woff2) format("woff2"); }'
+        'body { font-family: Brand, sans-serif; } h1, h2, strong { font-family: BrandBold; }</style>'
+        f'{images}<video src="/assets/culture.mp4" preload="auto" muted></video>{trackers}'
+    )
+
+
+class AssetHandler(BaseHTTPRequestHandler):
+    """Serves fixture pages with their assets, and the assets after a delay"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    pages = {}
+    asset_delay = 0.05
+
+    def do_GET(self):
+        extension = self.path.split('?')[0].rsplit('.', 1)[-1]
+        if extension in ASSET_BYTES:
+            time.sleep(self.asset_delay)
+            self.send_body(b'\0' * ASSET_BYTES[extension], ASSET_TYPES[extension])
+            return
+        html = next((html for domain, html in self.pages.items() if domain in self.path), None)
+        if html is None:
+            self.send_error(404)
+            return
+        self.send_body(html.replace('</body>', page_assets() + '</body>').encode('utf-8'),
+                       'text/html; charset=utf-8')
+
+    def send_body(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Timing-Allow-Origin', '*')  # Lets the Performance API see sizes
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def profile_factories(port=None):
+    """Driver factories of both profiles, sending tracker hosts to the local server"""
+    def with_local_trackers(options):
+        if port is not None:
+            hosts = {script.split('/')[0] for script in TRACKER_SCRIPTS}
+            options.add_argument('--host-resolver-rules=' + ', '.join(
+                f'MAP {host} 127.0.0.1:{port}' for host in sorted(hosts)))
+        return options
+
+    return {
+        'full': lambda: default_driver_factory(with_local_trackers(default_chrome_options())),
+        'lean': lambda: lean_driver_factory(options=with_local_trackers(lean_chrome_options())),
+    }
+
+
+def run_profile(factory, urls, rounds):
+    """Load every URL rounds times, returning page weights and wall time per page"""
+    weights = PageWeight()
+    readiness = PageReadiness(adaptive=False)
+    driver = factory()
+    wall = []
+    try:
+        for _ in range(rounds):
+            for url in urls:
+                start = time.perf_counter()
+                driver.get(url)
+                readiness.wait(driver, url)
+                wall.append((time.perf_counter() - start) * 1000)
+                weights.measure(driver, url)
+    finally:
+        driver.quit()
+    return weights.summary(), sum(wall) / len(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the full and lean browser profiles')
+    parser.add_argument('--rounds', type=int, default=3, help='Loads of every page per profile')
+    parser.add_argument('--asset-delay', type=float, default=0.05,
+                        help='Seconds the local server waits before sending each asset')
+    parser.add_argument('--url', action='append', help='Live URL to load instead of the fixtures')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    server = None
+    if args.url:
+        urls = args.url
+    else:
+        fixtures = load_fixtures()
+        AssetHandler.pages = {fixture['url'].split('/')[2]: fixture['html'] for fixture in fixtures}
+        AssetHandler.asset_delay = args.asset_delay
+        server = ThreadingHTTPServer(('127.0.0.1', 0), AssetHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        # The original URL goes in the path so platform rules still match
+        urls = [f"http://127.0.0.1:{server.server_port}/{fixture['url'].split('://', 1)[1]}"
+                for fixture in fixtures]
+
+    results = {}
+    for name, factory in profile_factories(server.server_port if server else None).items():
+        summary, wall_ms = run_profile(factory, urls, args.rounds)
+        pages = sum(stats['pages'] for stats in summary.values())
+        results[name] = {
+            'transfer_kb': sum(stats['transfer_bytes'] * stats['pages'] for stats in summary.values()) / pages / 1024,
+            'requests': sum(stats['requests'] * stats['pages'] for stats in summary.values()) / pages,
+            'ready_ms': sum(stats['elapsed_ms'] * stats['pages'] for stats in summary.values()) / pages,
+            'wall_ms': wall_ms,
+        }
+        print(f"{name:<5} {results[name]['transfer_kb']:9.1f}KB  {results[name]['requests']:5.1f} requests  "
+              f"ready {results[name]['ready_ms']:7.0f}ms  get+wait {wall_ms:7.0f}ms per page")
+
+    full, lean = results['full'], results['lean']
+    print(f"Lean profile saves {full['transfer_kb'] - lean['transfer_kb']:.1f}KB "
+          f"({1 - lean['transfer_kb'] / full['transfer_kb']:.0%}), "
+          f"{full['requests'] - lean['requests']:.1f} requests and "
+          f"{full['wall_ms'] - lean['wall_ms']:.0f}ms per page")
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
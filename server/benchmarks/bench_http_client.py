@@ -0,0 +1,74 @@
+# bench_http_client.py
+"""Compare per-request latency of module-level requests.post against the pooled client
+
+Runs the local stub_openai stand-in for /v1/chat/completions, so no network
+or API key is needed:
+
+    python benchmarks/bench_http_client.py -n 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_client import OpenAIClient  # noqa: E402
+from stub_openai import StubCompletionServer  # noqa: E402
+
+
+def time_requests(send, n):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        send()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(name, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{name:<22} mean {statistics.mean(latencies):7.3f}ms  "
+          f"p50 {statistics.median(latencies):7.3f}ms  p95 {p95:7.3f}ms")
+    return statistics.mean(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pooled OpenAI HTTP client')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='Requests per client')
+    args = parser.parse_args()
+
+    server = StubCompletionServer(letter_words=20).start()
+    api_base = server.api_base
+    payload = {"model": "gpt-4", "messages": [{"role": "user", "content": "JOB 1 DETAILS: " + "x" * 2000}]}
+
+    def unpooled():
+        response = requests.post(f"{api_base}/chat/completions", json=payload, timeout=45,
+                                 headers={"Authorization": "Bearer test"})
+        response.raise_for_status()
+        response.json()
+
+    client = OpenAIClient("test", api_base=api_base)
+
+    def pooled():
+        client.chat_completion(payload).json()
+
+    # Warm up both paths once before timing
+    unpooled()
+    pooled()
+
+    print(f"{args.requests} sequential requests against {api_base}")
+    before = summarize("requests.post", time_requests(unpooled, args.requests))
+    after = summarize("OpenAIClient (pooled)", time_requests(pooled, args.requests))
+    print(f"Saved {before - after:.3f}ms per request ({(1 - after / before) * 100:.1f}%) "
+          f"without TLS; real HTTPS endpoints also skip a TLS handshake per request")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
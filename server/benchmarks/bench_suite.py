@@ -0,0 +1,329 @@
+# bench_suite.py
+"""Offline benchmarks for extraction, batching and end-to-end job processing
+
+Uses the saved job board pages in benchmarks/fixtures, served from a local
+HTTP server, and a local stand-in for /v1/chat/completions, so no browser,
+network or API key is needed. Results are compared with baseline.json and
+the run fails when a metric is worse than the baseline by more than the
+tolerance.
+
+Timed metrics are gated on their speed relative to a fixed reference loop
+timed alongside them, not on absolute rates, so a baseline recorded on one
+machine still applies on a faster or slower one. Every workload is repeated
+until a timing lasts at least --min-time seconds, and the median of several
+timings is used:
+
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --update-baseline
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+from app import CoverLetterGenerator  # noqa: E402
+from batching import TokenBudgetBatcher  # noqa: E402
+from condense import JobDescriptionCondenser  # noqa: E402
+from extraction import ContentExtractor  # noqa: E402
+from stub_openai import StubCompletionServer  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+def load_fixtures():
+    """Saved pages with the URL each was captured from"""
+    with open(os.path.join(FIXTURES_DIR, 'manifest.json')) as f:
+        manifest = json.load(f)
+    for fixture in manifest:
+        with open(os.path.join(FIXTURES_DIR, fixture['file']), encoding='utf-8') as f:
+            fixture['html'] = f.read()
+    return manifest
+
+
+def metric(value, unit, better, relative=None, gate=True):
+    """A result; relative is its value measured in reference loops rather than seconds"""
+    result = {'value': round(value, 3), 'unit': unit, 'better': better, 'gate': gate}
+    if relative is not None:
+        result['relative'] = round(relative, 6)
+    return result
+
+
+def time_calls(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return time.perf_counter() - start
+
+
+def calls_for(func, min_time):
+    """Calls of func needed for one timing to last at least min_time
+
+    The count is doubled until a timing is long enough, so a short workload
+    is not measured at the scale of timer and scheduler noise.
+    """
+    calls = 1
+    while time_calls(func, calls) < min_time:
+        calls *= 2
+    return calls
+
+
+def reference_loop():
+    """Fixed mix of interpreter, string and dict work that tracks single-core speed"""
+    counts = {}
+    for i in range(20000):
+        term = f"term{i % 997}"
+        counts[term] = counts.get(term, 0) + len(term)
+    return sorted(counts.items())
+
+
+class ReferenceClock:
+    """Times the reference loop for at least min_time, in seconds per loop"""
+
+    def __init__(self, min_time=0.1):
+        self.calls = calls_for(reference_loop, min_time)
+
+    def __call__(self):
+        return time_calls(reference_loop, self.calls) / self.calls
+
+
+def paired_time(func, clock, min_time=0.1, repeat=5):
+    """Median seconds per call of func, and its median ratio to the reference loop
+
+    Each timing of func directly follows a timing of the reference loop, so
+    load on the machine that comes and goes shows up on both sides of the
+    ratio rather than in the gated value.
+    """
+    calls = calls_for(func, min_time)
+    timings, ratios = [], []
+    for _ in range(repeat):
+        reference = clock()
+        elapsed = time_calls(func, calls) / calls
+        timings.append(elapsed)
+        ratios.append(elapsed / reference)
+    return statistics.median(timings), statistics.median(ratios)
+
+
+def bench_reference(clock, repeat=5):
+    """Reference loops per second on this machine, reported for context only"""
+    reference = statistics.median(clock() for _ in range(repeat))
+    return {'reference.loops_per_s': metric(1 / reference, 'loops/s', 'higher', gate=False)}
+
+
+def bench_extraction(fixtures, clock, min_time=0.1, repeat=5):
+    """Pages per second and peak Python allocation of extracting each platform's page
+
+    tracemalloc only sees allocations made through Python's allocator, not
+    the parse tree libxml2 builds, so the peak tracks Python-side overhead.
+    """
+    extractor = ContentExtractor(condenser=JobDescriptionCondenser())
+    results = {}
+    for fixture in fixtures:
+        html, url = fixture['html'], fixture['url']
+        extractor.extract(html, url)  # Warm up selector compilation
+
+        elapsed, ratio = paired_time(lambda: extractor.extract(html, url), clock, min_time, repeat)
+
+        tracemalloc.start()
+        extractor.extract(html, url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[f"extraction.{fixture['platform']}.pages_per_s"] = metric(
+            1 / elapsed, 'pages/s', 'higher', relative=1 / ratio)
+        results[f"extraction.{fixture['platform']}.peak_kb"] = metric(peak / 1024, 'KB', 'lower')
+    return results
+
+
+def bench_batching(fixtures, clock, jobs=2000, min_time=0.1, repeat=5):
+    """Jobs per second through token counting, trimming and batch packing
+
+    Fitting and packing a job takes around a microsecond, so its rate is
+    reported but not gated; only the deterministic batch size is.
+    """
+    extractor = ContentExtractor(condenser=JobDescriptionCondenser())
+    texts = [extractor.extract(fixture['html'], fixture['url']) for fixture in fixtures]
+    contents = [f"{texts[i % len(texts)]} Posting {i}." for i in range(jobs)]
+    batcher = TokenBudgetBatcher(model='gpt-4', base_prompt_tokens=600)
+
+    elapsed, ratio = paired_time(lambda: batcher.pack([batcher.fit(content) for content in contents]),
+                                 clock, min_time, repeat)
+    batches = batcher.pack([batcher.fit(content) for content in contents])
+    return {
+        'batching.jobs_per_s': metric(jobs / elapsed, 'jobs/s', 'higher',
+                                      relative=jobs / ratio, gate=False),
+        'batching.jobs_per_batch': metric(jobs / len(batches), 'jobs', 'higher'),
+    }
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the fixture of whichever job board domain appears in the path"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    pages = {}
+
+    def do_GET(self):
+        body = next((html for domain, html in self.pages.items() if domain in self.path), None)
+        if body is None:
+            self.send_error(404)
+            return
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def no_browser():
+    raise RuntimeError("The benchmark serves every page over HTTP and never needs a browser")
+
+
+def bench_end_to_end(fixtures, clock, jobs=200, batch_size=5, repeat=5):
+    """Wall time of process_job_links against the local job board and API stand-ins
+
+    A run already takes well over --min-time, so each of the repeat runs is
+    timed once, between two reference timings, and the medians are reported.
+    Only the rate is gated, as the wall time is the same measurement.
+    """
+    FixtureHandler.pages = {fixture['url'].split('/')[2]: fixture['html'] for fixture in fixtures}
+    boards = serve(FixtureHandler)
+    api = StubCompletionServer(letter_words=20).start()
+    with open(os.path.join(FIXTURES_DIR, 'resume.txt'), encoding='utf-8') as f:
+        resume = f.read()
+
+    timings, ratios = [], []
+    for _ in range(repeat):
+        before = clock()
+        elapsed = run_end_to_end(fixtures, resume, boards, api, jobs, batch_size)
+        reference = (before + clock()) / 2
+        timings.append(elapsed)
+        ratios.append(elapsed / reference)
+    boards.shutdown()
+    api.shutdown()
+    elapsed, ratio = statistics.median(timings), statistics.median(ratios)
+    return {
+        'end_to_end.jobs_per_s': metric(jobs / elapsed, 'jobs/s', 'higher', relative=jobs / ratio),
+        'end_to_end.seconds': metric(elapsed, 's', 'lower', relative=ratio, gate=False),
+    }
+
+
+def run_end_to_end(fixtures, resume, boards, api, jobs, batch_size):
+    """Seconds one fresh generator takes to process jobs postings"""
+    with tempfile.TemporaryDirectory() as workdir:
+        # The original URL goes in the path so platform rules still match, and the
+        # job number keeps every cleaned URL distinct
+        urls = [
+            f"http://127.0.0.1:{boards.server_port}/{fixtures[i % len(fixtures)]['url'].split('://', 1)[1]}/{i}"
+            for i in range(jobs)
+        ]
+        excel_path = os.path.join(workdir, 'jobs.xlsx')
+        pd.DataFrame({'job_link': urls}).to_excel(excel_path, index=False)
+
+        # Every page comes from the local server, so no job board needs pacing
+        generator = CoverLetterGenerator(
+            resume, 'benchmark', num_browsers=4, politeness=False, driver_factory=no_browser,
+            cache_dir=None, completion_cache_path=None, profile_dir=None,
+            api_base=api.api_base
+        )
+        start = time.perf_counter()
+        results = generator.process_job_links(excel_path, os.path.join(workdir, 'out.xlsx'),
+                                              batch_size=batch_size, dedupe_threshold=None)
+        elapsed = time.perf_counter() - start
+
+    failed = sum(1 for result in results if result['cover_letter'].startswith('Error'))
+    if failed:
+        raise RuntimeError(f"{failed} of {jobs} benchmark jobs failed")
+    return elapsed
+
+
+def compare(results, baseline, tolerance):
+    """Print each metric against the baseline, returning the names that regressed
+
+    Timed metrics are compared on their value relative to the reference loop,
+    which cancels out the speed of the machine each run was made on.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<45} {result['value']:>12.3f} {result['unit']:<8} (no baseline)")
+            continue
+        key = 'relative' if 'relative' in result and 'relative' in reference else 'value'
+        change = (result[key] - reference[key]) / reference[key] if reference[key] else 0.0
+        worse = -change if result['better'] == 'higher' else change
+        if not result.get('gate', True):
+            status = 'not gated'
+        elif worse > tolerance:
+            status = 'REGRESSED'
+            regressions.append(name)
+        else:
+            status = 'ok'
+        print(f"{name:<45} {result['value']:>12.3f} {result['unit']:<8} "
+              f"{'relative' if key == 'relative' else 'absolute'} change {change:+.1%} {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline extraction, batching and pipeline benchmarks')
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='Seconds each timing of a workload lasts at least')
+    parser.add_argument('--repeat', type=int, default=5, help='Timings per workload; the median is used')
+    parser.add_argument('--jobs', type=int, default=200, help='Jobs in the end-to-end run')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='Allowed fraction a metric may be worse than the baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline results file')
+    parser.add_argument('--output', help='Also write these results to a JSON file')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store these results as the new baseline instead of comparing')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    fixtures = load_fixtures()
+    clock = ReferenceClock(args.min_time)
+    results = bench_reference(clock, args.repeat)
+    results.update(bench_extraction(fixtures, clock, args.min_time, args.repeat))
+    results.update(bench_batching(fixtures, clock, min_time=args.min_time, repeat=args.repeat))
+    results.update(bench_end_to_end(fixtures, clock, args.jobs, repeat=args.repeat))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} metrics regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# browser_pool.py
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Resources description extraction never needs: images, media and fonts by
+# extension (with or without a query string), and common trackers by host
+BLOCKED_EXTENSIONS = [
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'bmp', 'ico', 'svg',
+    'mp4', 'webm', 'mov', 'm4v', 'mp3', 'm4a', 'ogg', 'wav',
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+]
+TRACKER_HOSTS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'adservice.google.com', 'facebook.net', 'connect.facebook.com', 'hotjar.com', 'segment.com',
+    'segment.io', 'mixpanel.com', 'fullstory.com', 'clarity.ms', 'bat.bing.com',
+    'px.ads.linkedin.com', 'snap.licdn.com', 'quantserve.com', 'scorecardresearch.com',
+    'optimizely.com', 'nr-data.net', 'intercom.io', 'cookielaw.org', 'onetrust.com',
+]
+BLOCKED_URL_PATTERNS = (
+    [f'*.{extension}' for extension in BLOCKED_EXTENSIONS]
+    + [f'*.{extension}?*' for extension in BLOCKED_EXTENSIONS]
+    + [f'*{host}/*' for host in TRACKER_HOSTS]
+)
+
+
+def default_chrome_options():
+    """Chrome options shared by every pooled driver"""
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-notifications')
+    return chrome_options
+
+
+def default_driver_factory(options=None):
+    """Start a new Chrome driver with the default pool options"""
+    return webdriver.Chrome(options=options or default_chrome_options())
+
+
+def lean_chrome_options():
+    """Default options trimmed to what scraping job descriptions needs
+
+    Navigation returns at DOMContentLoaded ('eager') instead of waiting for
+    every subresource; the readiness wait decides when the page is usable.
+    """
+    chrome_options = default_chrome_options()
+    chrome_options.page_load_strategy = 'eager'
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-component-extensions-with-background-pages')
+    chrome_options.add_argument('--disable-background-networking')
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_argument('--mute-audio')
+    return chrome_options
+
+
+def lean_driver_factory(blocked_urls: Optional[List[str]] = None, options=None):
+    """Start a lean Chrome driver that refuses images, media, fonts and trackers"""
+    driver = webdriver.Chrome(options=options or lean_chrome_options())
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {
+            'urls': BLOCKED_URL_PATTERNS if blocked_urls is None else blocked_urls
+        })
+    except Exception as e:
+        # Still usable, just without request blocking
+        logger.warning(f"Could not enable request blocking: {str(e)}")
+    return driver
+
+
+BROWSER_PROFILES = {
+    'lean': lean_driver_factory,
+    'full': default_driver_factory,
+}
+
+
+def driver_factory_for(profile: str) -> Callable:
+    """Driver factory of a named browser profile ('lean' or 'full')"""
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile {profile!r}, expected one of {list(BROWSER_PROFILES)}")
+    return BROWSER_PROFILES[profile]
+
+
+class BrowserPool:
+    """Fixed-size pool of webdrivers with thread-safe checkout
+
+    Drivers come from driver_factory when given, otherwise from the named
+    browser profile.
+    """
+
+    def __init__(self, size: int = 1, driver_factory: Optional[Callable] = None,
+                 profile: str = 'lean'):
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1")
+        self.size = size
+        self.driver_factory = driver_factory or driver_factory_for(profile)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._drivers = []
+        self._started = 0
+        self._closed = False
+
+    def _acquire(self):
+        """Take an idle driver, starting one lazily while under capacity"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self._started < self.size:
+                    # Reserve the slot before releasing the lock
+                    self._started += 1
+                    break
+
+            # Wake up periodically in case a crashed driver freed a slot
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._lock:
+                self._started -= 1
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+        logger.info(f"Started browser {self._started} of {self.size}")
+        return driver
+
+    def _discard(self, driver):
+        """Quit a broken driver and free its slot for a replacement"""
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+                self._started -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        logger.warning("Discarded crashed browser, a replacement will be started on demand")
+
+    @staticmethod
+    def is_alive(driver) -> bool:
+        """Check whether a driver session still responds"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a driver for the duration of the block"""
+        driver = self._acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            if self.is_alive(driver):
+                self._idle.put(driver)
+            else:
+                self._discard(driver)
+            raise
+        except BaseException:
+            self._idle.put(driver)
+            raise
+        else:
+            self._idle.put(driver)
+
+    def map(self, func: Callable, items: List, workers: Optional[int] = None) -> List:
+        """Apply func to every item across the pool, keeping input order
+
+        workers defaults to the pool size; more threads only help when func
+        spends part of its time without a browser checked out.
+        """
+        if not items:
+            return []
+        workers = min(workers or self.size, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='browser') as executor:
+            return list(executor.map(func, items))
+
+    def close(self):
+        """Quit every driver in the pool"""
+        with self._lock:
+            self._closed = True
+            drivers = self._drivers
+            self._drivers = []
+            self._started = 0
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._idle = queue.Queue()
@@ -0,0 +1,109 @@
+# completion_cache.py
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CompletionCache:
+    """SQLite-backed cache of chat completion responses keyed by request payload"""
+
+    def __init__(self, path: str = '.completion_cache.sqlite', max_entries: Optional[int] = 10000,
+                 max_age: Optional[float] = None, enabled: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON completions (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(payload: Dict) -> str:
+        """Stable hash of the full request payload"""
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, payload: Dict) -> Optional[Dict]:
+        """Return the cached response for a payload, or None"""
+        if not self.enabled:
+            return None
+        key = self.key(payload)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.max_age is not None and now - row[1] > self.max_age:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, payload: Dict, response: Dict):
+        """Store a successful response for a payload"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.key(payload), payload.get('model'), json.dumps(response), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones beyond max_entries"""
+        if self.max_age is not None:
+            self._conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.max_age,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM completions WHERE key IN ("
+                " SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,116 @@
+# condense.py
+import logging
+import re
+from typing import List, Optional
+
+from tokens import count_tokens, truncate_to_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Sentence ends, and the bullets and separators postings use instead of them
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“(])|\s*[•▪●■◦]\s*|\s+[-–—]\s+(?=[A-Z])')
+
+# Sentences matching these carry no information about the role itself
+BOILERPLATE_PATTERNS = [
+    r'equal (?:employment )?opportunity', r'\beeo\b', r'affirmative action',
+    r'regardless of (?:race|age|sex|gender|religion)', r'without regard to',
+    r'race, colou?r, religion', r'sexual orientation', r'gender identity',
+    r'protected (?:veteran|characteristic|class)', r'disabilit(?:y|ies) status',
+    r'reasonable accommodation', r'e-verify', r'background check',
+    r'pay transparency', r'privacy (?:policy|notice)', r'\bcookies?\b',
+    r'\b401\(?k\)?', r'paid time off', r'\bpto\b', r'parental leave',
+    r'medical, dental', r'dental and vision', r'health insurance', r'wellness stipend',
+    r'apply (?:now|today|for this job)', r'click (?:here|apply)', r'sign in',
+    r'share this job', r'similar jobs', r'show (?:more|less)', r'see who .* hired',
+    r'recruitment agencies', r'unsolicited resumes', r'we (?:are|\'re) (?:proud to be )?an equal',
+]
+BOILERPLATE_RE = re.compile('|'.join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+
+# Sentences matching these describe what the job needs or involves
+REQUIREMENT_PATTERNS = [
+    r'\brequire', r'\bqualif', r'\bresponsib', r'\bexperience', r'\byears?\b',
+    r'\bmust\b', r'\bshould\b', r'\bskills?\b', r'\bproficien', r'\bexpertise',
+    r'\bknowledge of', r'\bability to', r'\bdegree\b', r'\bfamiliar', r'\bpreferred',
+    r'\bnice to have', r'\bplus\b', r'\byou will\b', r'\byou\'ll\b', r'\byou have\b',
+    r'\bwhat you', r'\bin this role', r'\bown\b', r'\blead\b', r'\bbuild', r'\bdesign',
+    r'\bdevelop', r'\bmanag', r'\bpartner with', r'\bcollaborat', r'\bdrive\b', r'\bdeliver',
+]
+REQUIREMENT_RE = re.compile('|'.join(REQUIREMENT_PATTERNS), re.IGNORECASE)
+NORMALIZE_RE = re.compile(r'[^a-z0-9]+')
+
+
+def split_sentences(paragraphs: List[str]) -> List[str]:
+    """Sentences and bullet items of the paragraphs, in order"""
+    sentences = []
+    for paragraph in paragraphs:
+        for sentence in SENTENCE_SPLIT_RE.split(' '.join(paragraph.split())):
+            sentence = sentence.strip(' -–—')
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+def is_boilerplate(sentence: str) -> bool:
+    return bool(BOILERPLATE_RE.search(sentence))
+
+
+def is_requirement(sentence: str) -> bool:
+    return bool(REQUIREMENT_RE.search(sentence))
+
+
+class JobDescriptionCondenser:
+    """Extractive condenser that keeps a posting's requirement sentences within a token budget
+
+    Boilerplate and repeated sentences are dropped. Requirement and
+    responsibility sentences are kept first, then the remaining ones, and
+    whatever fits is returned in its original order. The first sentence that
+    does not fit is cut down to the budget left over rather than dropped, so
+    a posting without sentence breaks still condenses to its opening.
+    """
+
+    def __init__(self, max_tokens: int = 450, model: str = 'gpt-4', min_words: int = 3):
+        self.max_tokens = max_tokens
+        self.model = model
+        self.min_words = min_words
+
+    def sentences(self, paragraphs: List[str]) -> List[str]:
+        """Informative, distinct sentences of the paragraphs, in order"""
+        seen = set()
+        kept = []
+        for sentence in split_sentences(paragraphs):
+            key = NORMALIZE_RE.sub(' ', sentence.lower()).strip()
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if len(sentence.split()) < self.min_words or is_boilerplate(sentence):
+                continue
+            kept.append(sentence)
+        return kept
+
+    def condense(self, paragraphs: List[str], max_tokens: Optional[int] = None) -> str:
+        """Condense paragraphs of a posting into at most max_tokens tokens"""
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        sentences = self.sentences(paragraphs)
+        # Requirement sentences first, each group in document order
+        order = sorted(range(len(sentences)), key=lambda i: (not is_requirement(sentences[i]), i))
+
+        chosen, used = {}, 0
+        overflow = None
+        for i in order:
+            # Sentences are joined with a space, which costs about one token each
+            cost = count_tokens(sentences[i], self.model) + 1
+            if used + cost > budget:
+                if overflow is None:
+                    overflow = i
+                continue
+            chosen[i] = sentences[i]
+            used += cost
+        if overflow is not None and budget - used > 1:
+            prefix = truncate_to_tokens(sentences[overflow], budget - used - 1, self.model).rstrip()
+            if prefix:
+                chosen[overflow] = prefix
+        return ' '.join(chosen[i] for i in sorted(chosen))
+
+    def condense_text(self, text: str, max_tokens: Optional[int] = None) -> str:
+        return self.condense([text], max_tokens)
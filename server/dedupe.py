@@ -0,0 +1,128 @@
+# dedupe.py
+import logging
+import re
+import zlib
+from typing import Dict, FrozenSet, Hashable, List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r'\w+')
+MAX_HASH = np.uint64(2 ** 32 - 1)
+
+
+def distinct_words(text: str) -> FrozenSet[str]:
+    """Lower-cased words of a text, ignoring bare numbers such as job IDs and dates"""
+    return frozenset(word for word in WORD_RE.findall(text.lower()) if not word.isdigit())
+
+
+def shingles(text: str, size: int = 5) -> List[str]:
+    """Overlapping word n-grams of lower-cased text"""
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class MinHasher:
+    """MinHash signatures using vectorized multiply-shift hash permutations"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd 64-bit multipliers; uint64 arithmetic wraps, the top 32 bits are the hash
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64
+        )
+        if not hashes.size:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(left: np.ndarray, right: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(left == right))
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures that maps each posting to its first near-duplicate
+
+    Signatures are split into bands; postings sharing any band become
+    candidates, and a candidate only counts as a duplicate when its
+    estimated similarity reaches the threshold. With same_words, it must
+    also use exactly the same words, so the same role posted for another
+    location, level or company is never collapsed however similar the
+    rest of the text is.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, same_words: bool = True):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.same_words = same_words
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._words: Dict[Hashable, FrozenSet[str]] = {}
+        self.seen = 0
+        self.duplicates = 0
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key: Hashable, text: str) -> Optional[Hashable]:
+        """Index a posting, returning the key of an earlier near-duplicate if there is one"""
+        self.seen += 1
+        signature = self.hasher.signature(text)
+        band_keys = self._band_keys(signature)
+        words = distinct_words(text) if self.same_words else None
+
+        candidates = []
+        for buckets, band_key in zip(self._buckets, band_keys):
+            for candidate in buckets.get(band_key, ()):
+                if candidate not in candidates:
+                    candidates.append(candidate)
+        for candidate in candidates:
+            if self.hasher.similarity(signature, self._signatures[candidate]) < self.threshold:
+                continue
+            if self.same_words and words != self._words[candidate]:
+                continue
+            self.duplicates += 1
+            return candidate
+
+        self._signatures[key] = signature
+        if self.same_words:
+            self._words[key] = words
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets.setdefault(band_key, []).append(key)
+        return None
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of indexed postings that were near-duplicates"""
+        return self.duplicates / self.seen if self.seen else 0.0
+
+    def summary(self) -> Dict:
+        return {
+            'seen': self.seen,
+            'unique': self.seen - self.duplicates,
+            'duplicates': self.duplicates,
+            'ratio': round(self.ratio, 3)
+        }
+
+    def log_summary(self):
+        stats = self.summary()
+        logger.info(f"Near-duplicate postings: {stats['duplicates']} of {stats['seen']} "
+                    f"({stats['ratio']:.1%}) shared a letter with an earlier posting")
@@ -0,0 +1,228 @@
+# extraction.py
+import logging
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from condense import JobDescriptionCondenser
+
+try:
+    import lxml.html
+    from lxml import etree
+    PARSER = 'lxml'
+except ImportError:  # Slower, but always available
+    lxml = None
+    PARSER = 'html.parser'
+
+try:
+    from lxml.cssselect import CSSSelector
+except ImportError:  # Needs the cssselect package
+    CSSSelector = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UNWANTED_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'noscript', 'svg']
+PARAGRAPH_TAGS = ['p', 'li']
+
+# Tried after the platform's own selectors, most specific first
+GENERIC_SELECTORS = [
+    '.jobs-description-content__text',
+    '.description__text',
+    '.greenhouse-job-description',
+    '.job-description',
+    '#job-description',
+    '[data-testid="job-description"]',
+    'main',
+    'article',
+    'div[class*="content"]',
+    'div[class*="description"]'
+]
+
+
+class PlatformRule:
+    """Description selectors for one job board"""
+
+    def __init__(self, name: str, domains: List[str], selectors: List[str]):
+        self.name = name
+        self.domains = domains
+        self.selectors = selectors
+
+    def matches(self, url: str) -> bool:
+        return any(domain in url for domain in self.domains)
+
+
+_registry: Dict[str, PlatformRule] = {}
+
+
+def register_platform(name: str, domains: List[str], selectors: List[str]) -> PlatformRule:
+    """Register (or replace) the selectors used for a job board"""
+    rule = PlatformRule(name, domains, selectors)
+    _registry[name] = rule
+    return rule
+
+
+def platform_rule(url: Optional[str]) -> Optional[PlatformRule]:
+    """Rule for the job board hosting url, if one is registered"""
+    if not url:
+        return None
+    return next((rule for rule in _registry.values() if rule.matches(url)), None)
+
+
+def registered_platforms() -> List[PlatformRule]:
+    return list(_registry.values())
+
+
+register_platform('LinkedIn', ['linkedin.com'], [
+    '.jobs-description-content__text',
+    '.description__text',
+    '.show-more-less-html__markup',
+    '.jobs-box__html-content',
+    '[data-job-description-content]'
+])
+register_platform('Greenhouse', ['greenhouse.io'], [
+    '.job__description',
+    '.greenhouse-job-description',
+    '.job-description',
+    '#job_description',
+    '.field-group-format-wrapper'
+])
+register_platform('ClimateBase', ['climatebase.org'], [
+    '.job-details',
+    '.job-description',
+    '[data-testid="job-description"]'
+])
+register_platform('Ashby', ['ashbyhq.com'], [
+    '.job-description-section',
+    '.job-description',
+    '[data-testid="job-description"]'
+])
+
+
+_compiled_selectors = {}
+
+
+def compiled_selector(selector: str):
+    """Translate a CSS selector to a reusable lxml XPath matcher"""
+    if selector not in _compiled_selectors:
+        _compiled_selectors[selector] = CSSSelector(selector, translator='html')
+    return _compiled_selectors[selector]
+
+
+def node_text(node, separator: str = '') -> str:
+    """Text of an lxml node, joined like BeautifulSoup's get_text(separator, strip=True)"""
+    return separator.join(text.strip() for text in node.itertext() if text.strip())
+
+
+def parse_body(html_content: str):
+    """Parse a page with lxml and return its body with unwanted elements removed"""
+    try:
+        root = lxml.html.fromstring(html_content)
+    except ValueError:
+        # Strings carrying an XML encoding declaration must be parsed as bytes
+        root = lxml.html.fromstring(html_content.encode('utf-8'))
+    body = root.find('body')
+    if body is None:
+        body = root
+    etree.strip_elements(body, etree.Comment, *UNWANTED_TAGS, with_tail=False)
+    return body
+
+
+def parse_html(html_content: str) -> BeautifulSoup:
+    """Parse only the document body where possible, dropping the head entirely"""
+    soup = BeautifulSoup(html_content, PARSER, parse_only=SoupStrainer('body'))
+    if not soup.contents:
+        # Fragments without a <body> tag
+        soup = BeautifulSoup(html_content, PARSER)
+    for unwanted in soup.find_all(UNWANTED_TAGS):
+        unwanted.decompose()
+    return soup
+
+
+class ContentExtractor:
+    """Extracts job description text using the platform selector registry
+
+    With a condenser, every paragraph is kept in document order and the
+    condenser trims the text to its token budget instead of cutting it at
+    max_chars / fallback_chars.
+    """
+
+    def __init__(self, max_chars: int = 2500, fallback_chars: int = 2000,
+                 min_paragraph_words: int = 0, top_paragraphs: Optional[int] = 5,
+                 condenser: Optional[JobDescriptionCondenser] = None):
+        self.max_chars = max_chars
+        self.fallback_chars = fallback_chars
+        self.min_paragraph_words = min_paragraph_words
+        self.top_paragraphs = top_paragraphs
+        self.condenser = condenser
+
+    def selectors_for(self, url: Optional[str]) -> List[str]:
+        """Platform selectors first, then the generic ones, without repeats"""
+        rule = platform_rule(url)
+        selectors = (rule.selectors if rule else []) + GENERIC_SELECTORS
+        return list(dict.fromkeys(selectors))
+
+    def rank(self, texts: List[str]) -> List[str]:
+        """Meaningful paragraphs of one element, longest first when limited"""
+        scored = []
+        for text in texts:
+            words = len(text.split())
+            if words > self.min_paragraph_words:
+                scored.append((text, words))
+        if self.top_paragraphs and self.condenser is None:
+            # Keep the longest paragraphs of each element
+            scored = sorted(scored, key=lambda p: p[1], reverse=True)[:self.top_paragraphs]
+        return [text for text, _ in scored]
+
+    def extract(self, html_content: str, url: Optional[str] = None) -> str:
+        """Return the job description text of a page"""
+        if not html_content or not html_content.strip():
+            return ''
+        if CSSSelector is not None:
+            # Native lxml tree, skipping BeautifulSoup's Python-level tree building
+            return self._extract_lxml(html_content, url)
+        return self._extract_soup(html_content, url)
+
+    def _finish(self, selector: str, paragraphs: List[str]) -> str:
+        logger.debug(f"Content extracted using selector: {selector}")
+        if self.condenser is not None:
+            return self.condenser.condense(paragraphs)
+        return ' '.join(' '.join(paragraphs).split())[:self.max_chars]
+
+    def _extract_lxml(self, html_content: str, url: Optional[str]) -> str:
+        body = parse_body(html_content)
+
+        for selector in self.selectors_for(url):
+            elements = compiled_selector(selector)(body)
+            if not elements:
+                continue
+            paragraphs = []
+            for element in elements:
+                texts = [node_text(node) for node in element.iterdescendants(*PARAGRAPH_TAGS)]
+                paragraphs.extend(self.rank(texts))
+            if paragraphs:
+                return self._finish(selector, paragraphs)
+
+        # Ultimate fallback
+        if self.condenser is not None:
+            return self.condenser.condense_text(node_text(body, ' '))
+        return ' '.join(node_text(body).split())[:self.fallback_chars]
+
+    def _extract_soup(self, html_content: str, url: Optional[str]) -> str:
+        soup = parse_html(html_content)
+
+        for selector in self.selectors_for(url):
+            elements = soup.select(selector)
+            if not elements:
+                continue
+            paragraphs = []
+            for element in elements:
+                texts = [node.get_text(strip=True) for node in element.find_all(PARAGRAPH_TAGS)]
+                paragraphs.extend(self.rank(texts))
+            if paragraphs:
+                return self._finish(selector, paragraphs)
+
+        # Ultimate fallback
+        if self.condenser is not None:
+            return self.condenser.condense_text(soup.get_text(' ', strip=True))
+        return ' '.join(soup.get_text(strip=True).split())[:self.fallback_chars]
@@ -0,0 +1,116 @@
+# fetchers.py
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HTTP = 'http'
+BROWSER = 'browser'
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/122.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Markers of pages that only render their content with JavaScript
+JS_SHELL_PATTERNS = [
+    re.compile(r'<noscript>[^<]*(enable|turn on)\s+javascript', re.IGNORECASE),
+    re.compile(r'<div[^>]+id=["\'](root|app|__next)["\'][^>]*>\s*</div>', re.IGNORECASE),
+    re.compile(r'you need to enable javascript', re.IGNORECASE),
+]
+TAG_RE = re.compile(r'<[^>]+>')
+SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+
+
+def looks_like_js_shell(html: str, min_visible_chars: int = 500) -> bool:
+    """Guess whether raw HTML is an empty shell waiting on JavaScript"""
+    if not html:
+        return True
+    if any(pattern.search(html) for pattern in JS_SHELL_PATTERNS):
+        return True
+    visible = TAG_RE.sub(' ', SCRIPT_STYLE_RE.sub(' ', html))
+    return len(' '.join(visible.split())) < min_visible_chars
+
+
+class HttpFetcher:
+    """Plain HTTP page fetcher backed by a pooled keep-alive session"""
+
+    def __init__(self, pool_size: int = 10, timeout: float = 15):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url: str) -> str:
+        """Return the raw HTML of a URL"""
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def close(self):
+        self.session.close()
+
+
+class FetchStrategyRegistry:
+    """Remembers per domain whether plain HTTP or the browser worked"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._strategies: Dict[str, str] = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def domain(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def get(self, url: str) -> Optional[str]:
+        """Return the recorded fetch path for the URL's domain, if any"""
+        with self._lock:
+            return self._strategies.get(self.domain(url))
+
+    def record(self, url: str, strategy: str):
+        """Record which fetch path produced content for the URL's domain"""
+        domain = self.domain(url)
+        with self._lock:
+            if self._strategies.get(domain) == strategy:
+                return
+            self._strategies[domain] = strategy
+            if self.path:
+                self.save()
+        logger.info(f"Using {strategy} fetches for {domain}")
+
+    def as_dict(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._strategies)
+
+    def save(self):
+        """Persist strategies so later runs skip the probe"""
+        with self._lock:
+            with open(self.path, 'w') as f:
+                json.dump(self._strategies, f, indent=2)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            with self._lock:
+                self._strategies.update(data)
+        except Exception as e:
+            logger.error(f"Error loading fetch strategies: {str(e)}")
@@ -0,0 +1,64 @@
+# generation_engine.py
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AsyncGenerationEngine:
+    """Keeps a bounded number of cover letter completion requests in flight"""
+
+    def __init__(self, generator, max_in_flight: int = 4):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.generator = generator
+        self.max_in_flight = max_in_flight
+        self._semaphore = None
+        self._executor = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        # Requests are blocking, so each in-flight call gets its own worker thread
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                            thread_name_prefix='generation')
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._semaphore = None
+
+    async def generate(self, batch: List[str], label: str = '',
+                       on_letter: Optional[Callable[[int, str], None]] = None,
+                       job_labels: Optional[List[str]] = None) -> List[str]:
+        """Generate letters for one batch once a request slot is free
+
+        job_labels name the batch's jobs in the per-job metrics.
+        """
+        async with self._semaphore:
+            logger.info(f"Generating batch {label} ({len(batch)} jobs)")
+            loop = asyncio.get_running_loop()
+            generate = functools.partial(self.generator.generate_multiple_cover_letters,
+                                         batch, on_letter=on_letter, labels=job_labels)
+            try:
+                return await loop.run_in_executor(self._executor, generate)
+            except Exception as e:
+                logger.error(f"Error generating batch {label}: {str(e)}")
+                return ["Error generating cover letter"] * len(batch)
+
+    async def generate_batches(self, batches: List[List[str]]) -> List[List[str]]:
+        """Generate letters for every batch concurrently, keeping batch order"""
+        if not batches:
+            return []
+        async with self:
+            return await asyncio.gather(*(
+                self.generate(batch, f"{i + 1} of {len(batches)}") for i, batch in enumerate(batches)
+            ))
+
+    def run(self, batches: List[List[str]]) -> List[List[str]]:
+        """Synchronous entry point for callers outside an event loop"""
+        return asyncio.run(self.generate_batches(batches))
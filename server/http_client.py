@@ -0,0 +1,88 @@
+# http_client.py
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+# Overrides the endpoint, e.g. to point runs at a local stub_openai server
+API_BASE_ENV = "OPENAI_BASE_URL"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(pool_size: int = 10, max_retries: int = 3,
+                  backoff_factor: float = 1.0) -> requests.Session:
+    """Keep-alive session with a bounded connection pool and retry policy
+
+    Only failures the server reported (429/5xx) and connections that never
+    sent the request are retried. A read timeout or dropped connection may
+    come after the API started a billed generation, so those POSTs are not
+    sent again.
+    """
+    retry = Retry(
+        total=max_retries,
+        read=0,
+        other=0,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,  # Completions are POSTs, retry them too
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry, pool_block=True)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def default_api_base() -> str:
+    """API base from OPENAI_BASE_URL, read when a client is built so .env files apply"""
+    return os.getenv(API_BASE_ENV) or DEFAULT_API_BASE
+
+
+class OpenAIClient:
+    """Chat completion client sharing one pooled session across threads
+
+    The session is safe to use from the worker threads the async generation
+    engine runs requests on, so the sync and async paths reuse the same
+    warm connections.
+    """
+
+    def __init__(self, api_key: str, api_base: Optional[str] = None, pool_size: int = 10,
+                 connect_timeout: float = 5, read_timeout: float = 45,
+                 max_retries: int = 3, backoff_factor: float = 1.0):
+        self.api_key = api_key
+        self.api_base = (api_base or default_api_base()).rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = build_session(pool_size, max_retries, backoff_factor)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        })
+
+    @property
+    def completions_url(self) -> str:
+        return f"{self.api_base}/chat/completions"
+
+    def chat_completion(self, payload: Dict, stream: bool = False) -> requests.Response:
+        """POST a chat completion request, raising on HTTP errors"""
+        response = self.session.post(self.completions_url, json=payload,
+                                     timeout=self.timeout, stream=stream)
+        response.raise_for_status()
+        return response
+
+    async def achat_completion(self, payload: Dict) -> requests.Response:
+        """Async wrapper running the pooled request on a worker thread"""
+        return await asyncio.to_thread(self.chat_completion, payload)
+
+    def close(self):
+        self.session.close()
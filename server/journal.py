@@ -0,0 +1,47 @@
+# journal.py
+import json
+import logging
+import os
+from typing import Dict
+
+from links import JobLinks
+from sinks import JsonlSink
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def is_complete(record: Dict) -> bool:
+    """Whether a journaled job has both usable content and a usable letter"""
+    letter = record.get('cover_letter') or ''
+    content = record.get('job_content') or ''
+    return bool(letter) and not letter.startswith('Error') and not content.startswith('Error')
+
+
+class RunJournal(JsonlSink):
+    """Append-only JSONL record of finished jobs, durable across crashes"""
+
+    def __init__(self, path: str):
+        super().__init__(path, fsync=True)
+
+    def load(self) -> Dict[str, Dict]:
+        """Latest journaled record per cleaned job URL"""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a partial last line
+                    logger.warning(f"Skipping unreadable journal line {line_number} in {self.path}")
+                    continue
+                records[JobLinks.clean_url(record['job_link'])] = record
+        return records
+
+    def completed(self) -> Dict[str, Dict]:
+        """Journaled jobs that do not need to be redone"""
+        return {url: record for url, record in self.load().items() if is_complete(record)}
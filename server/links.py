@@ -36,7 +36,8 @@ class JobLinks:
         self.cleaned_links = []
         self.clean_all_links()
 
-    def clean_url(self, url: str) -> str:
+    @staticmethod
+    def clean_url(url: str) -> str:
         """Remove tracking parameters and clean URLs"""
         # Remove query parameters
         base_url = url.split('?')[0]
@@ -48,7 +49,8 @@ class JobLinks:
         self.cleaned_links = [self.clean_url(url) for url in self.job_links]
         logger.info(f"Cleaned {len(self.cleaned_links)} links")
 
-    def get_source_type(self, url: str) -> str:
+    @staticmethod
+    def get_source_type(url: str) -> str:
         """Determine the source of the job posting"""
         if 'linkedin.com' in url:
             return 'LinkedIn'
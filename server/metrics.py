@@ -0,0 +1,149 @@
+# metrics.py
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from stats import percentile
+from tokens import count_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# USD per 1K prompt and completion tokens
+MODEL_PRICES = {
+    'gpt-4': {'prompt': 0.03, 'completion': 0.06},
+    'gpt-4-turbo': {'prompt': 0.01, 'completion': 0.03},
+    'gpt-4o': {'prompt': 0.0025, 'completion': 0.01},
+    'gpt-4o-mini': {'prompt': 0.00015, 'completion': 0.0006},
+    'gpt-3.5-turbo': {'prompt': 0.0005, 'completion': 0.0015},
+}
+
+
+def model_prices(model: str) -> Dict[str, float]:
+    """Prices for a model, matching on the longest known prefix"""
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    if not matches:
+        return MODEL_PRICES['gpt-4']
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+def request_cost(model: str, prompt_tokens: float, completion_tokens: float) -> float:
+    prices = model_prices(model)
+    return (prompt_tokens * prices['prompt'] + completion_tokens * prices['completion']) / 1000
+
+
+class RunMetrics:
+    """Token, cost and latency accounting for every completion request of a run
+
+    Each request is recorded with its local prompt estimate and the usage
+    the API reported. Its prompt and completion tokens are shared out to the
+    jobs in it: the common prompt evenly, each job's posting and letter by
+    their own token counts.
+
+    A failed request is only costed if the API reported usage for it or may
+    already have started generating, i.e. it timed out reading the response
+    or its stream was cut off. Rejected requests (429/5xx) and connections
+    that failed are not billed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches: List[Dict] = []
+        self.jobs: List[Dict] = []
+        self.started = time.time()
+
+    def record_request(self, model: str, job_contents: List[str], letters: List[str],
+                       prompt_tokens: int, latency: float, usage: Optional[Dict] = None,
+                       cached: bool = False, streamed: bool = False, error: Optional[str] = None,
+                       generation_started: bool = False, labels: Optional[List[str]] = None):
+        """Record one completion request; labels (usually URLs) name its jobs in per-job metrics"""
+        job_tokens = [count_tokens(content, model) for content in job_contents]
+        # Error placeholders were written locally, not generated by the API
+        letter_tokens = [0 if not letter or letter.startswith('Error') else count_tokens(letter, model)
+                         for letter in letters]
+        usage = usage or {}
+        billed_prompt = usage.get('prompt_tokens', prompt_tokens)
+        billed_completion = usage.get('completion_tokens', sum(letter_tokens))
+        billed = not cached and (bool(usage) or not error or generation_started)
+        cost = request_cost(model, billed_prompt, billed_completion) if billed else 0.0
+
+        shared_prompt = max(billed_prompt - sum(job_tokens), 0) / max(len(job_contents), 1)
+        completion_scale = billed_completion / sum(letter_tokens) if sum(letter_tokens) else 0.0
+
+        with self._lock:
+            batch_number = len(self.batches) + 1
+            self.batches.append({
+                'batch': batch_number,
+                'model': model,
+                'jobs': len(job_contents),
+                'prompt_tokens_estimate': prompt_tokens,
+                'prompt_tokens': billed_prompt,
+                'completion_tokens': billed_completion,
+                'usage_reported': bool(usage),
+                'cost_usd': round(cost, 6),
+                'latency_s': round(latency, 3),
+                'cached': cached,
+                'streamed': streamed,
+                'error': error,
+            })
+            labels = labels or [content[:80] for content in job_contents]
+            for content, label, tokens, letter in zip(job_contents, labels, job_tokens, letter_tokens):
+                prompt_share = shared_prompt + tokens
+                completion_share = letter * completion_scale
+                self.jobs.append({
+                    'job': label,
+                    'batch': batch_number,
+                    'posting_tokens': tokens,
+                    'prompt_tokens': round(prompt_share, 1),
+                    'completion_tokens': round(completion_share, 1),
+                    'cost_usd': round(request_cost(model, prompt_share, completion_share)
+                                      if billed else 0.0, 6),
+                })
+
+    def summary(self, top: int = 5) -> Dict:
+        with self._lock:
+            batches = list(self.batches)
+            jobs = list(self.jobs)
+        live = [batch for batch in batches if not batch['cached']]
+        latencies = [batch['latency_s'] for batch in live]
+        return {
+            'requests': len(batches),
+            'cached_requests': len(batches) - len(live),
+            'failed_requests': sum(1 for batch in batches if batch['error']),
+            'jobs': len(jobs),
+            'prompt_tokens': sum(batch['prompt_tokens'] for batch in live),
+            'completion_tokens': sum(batch['completion_tokens'] for batch in live),
+            'cost_usd': round(sum(batch['cost_usd'] for batch in batches), 4),
+            'cost_per_job_usd': round(sum(job['cost_usd'] for job in jobs) / len(jobs), 4) if jobs else 0.0,
+            'latency_p50_s': percentile(latencies, 50),
+            'latency_p95_s': percentile(latencies, 95),
+            'latency_max_s': max(latencies) if latencies else 0.0,
+            'most_expensive_jobs': sorted(jobs, key=lambda job: job['cost_usd'], reverse=True)[:top],
+        }
+
+    def log_summary(self):
+        stats = self.summary()
+        logger.info(
+            f"Completion requests: {stats['requests']} ({stats['cached_requests']} cached, "
+            f"{stats['failed_requests']} failed), {stats['prompt_tokens']} prompt + "
+            f"{stats['completion_tokens']} completion tokens, ${stats['cost_usd']:.4f} "
+            f"(${stats['cost_per_job_usd']:.4f} per job), latency p50 {stats['latency_p50_s']:.1f}s "
+            f"p95 {stats['latency_p95_s']:.1f}s"
+        )
+        for job in stats['most_expensive_jobs']:
+            logger.info(f"  ${job['cost_usd']:.4f} {job['posting_tokens']} posting tokens: {job['job']}")
+
+    def export(self, path: str):
+        """Write the summary, per-batch and per-job metrics as JSON"""
+        with self._lock:
+            report = {
+                'started_at': self.started,
+                'batches': list(self.batches),
+                'jobs': list(self.jobs),
+            }
+        report['summary'] = self.summary()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f"Saved run metrics to {path}")
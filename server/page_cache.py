@@ -0,0 +1,128 @@
+# page_cache.py
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from links import JobLinks
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = '.json.gz'
+
+
+class PageCache:
+    """On-disk cache of scraped job pages keyed by their cleaned URL"""
+
+    def __init__(self, cache_dir: str = '.page_cache', ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(p) for p in self._entry_paths())
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Content address of a URL: hash of its cleaned form"""
+        return hashlib.sha256(JobLinks.clean_url(url).encode('utf-8')).hexdigest()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, self.key(url) + CACHE_SUFFIX)
+
+    def _entry_paths(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(CACHE_SUFFIX):
+                yield os.path.join(self.cache_dir, name)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for a URL, or None if missing or expired"""
+        path = self._path(url)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry for {url}: {str(e)}")
+            self._remove(path)
+            self._count(hit=False)
+            return None
+
+        if self.ttl is not None and time.time() - entry.get('fetched_at', 0) > self.ttl:
+            self._remove(path)
+            self._count(hit=False)
+            return None
+
+        # Bump the modification time so eviction treats this entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(hit=True)
+        return entry
+
+    def put(self, url: str, html: str, text: str):
+        """Store a page's raw HTML and extracted text"""
+        entry = {
+            'url': JobLinks.clean_url(url),
+            'fetched_at': time.time(),
+            'html': html,
+            'text': text,
+        }
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until under the size bound"""
+        entries = sorted(
+            ((os.path.getmtime(p), os.path.getsize(p), p) for p in self._entry_paths()),
+            key=lambda e: e[0]
+        )
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            os.remove(path)
+            self._size -= size
+            logger.info(f"Evicted cached page {os.path.basename(path)}")
+
+    def _remove(self, path: str):
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._entry_paths()):
+                os.remove(path)
+            self._size = 0
@@ -0,0 +1,84 @@
+# page_weight.py
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from links import JobLinks
+from stats import percentile
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bytes and requests the page has loaded so far, from the Performance API.
+# Cross-origin resources without Timing-Allow-Origin report zero sizes, so
+# byte totals are a lower bound; blocked requests never appear at all.
+PAGE_WEIGHT_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let transfer = nav ? nav.transferSize : 0;
+let decoded = nav ? nav.decodedBodySize : 0;
+for (const resource of resources) {
+    transfer += resource.transferSize;
+    decoded += resource.decodedBodySize;
+}
+return {
+    requests: resources.length + 1,
+    transfer_bytes: transfer,
+    decoded_bytes: decoded,
+    dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : 0,
+    elapsed_ms: performance.now()
+};
+"""
+
+
+class PageWeight:
+    """Per-platform bytes, requests and time each scraped page cost the browser
+
+    Measured once the page is ready, so elapsed_ms is the time from
+    navigation start until the description could be read.
+    """
+
+    FIELDS = ('requests', 'transfer_bytes', 'decoded_bytes', 'dom_content_loaded_ms', 'elapsed_ms')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages: Dict[str, List[Dict]] = defaultdict(list)
+
+    def measure(self, driver, url: str) -> Optional[Dict]:
+        """Read the current page's weight from the browser and record it"""
+        try:
+            weight = driver.execute_script(PAGE_WEIGHT_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Could not measure page weight of {url}: {str(e)}")
+            return None
+        if not weight:
+            return None
+        weight = {field: float(weight.get(field) or 0) for field in self.FIELDS}
+        self.record(JobLinks.get_source_type(url), weight)
+        return weight
+
+    def record(self, platform: str, weight: Dict):
+        with self._lock:
+            self._pages[platform].append(weight)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-platform mean of every field, plus p95 of the time to ready"""
+        with self._lock:
+            pages = {platform: list(weights) for platform, weights in self._pages.items()}
+        summary = {}
+        for platform, weights in pages.items():
+            stats = {'pages': len(weights)}
+            for field in self.FIELDS:
+                stats[field] = sum(weight[field] for weight in weights) / len(weights)
+            stats['elapsed_ms_p95'] = percentile([weight['elapsed_ms'] for weight in weights], 95)
+            summary[platform] = stats
+        return summary
+
+    def log_summary(self):
+        for platform, stats in self.summary().items():
+            logger.info(
+                f"{platform}: {stats['pages']} pages, mean {stats['transfer_bytes'] / 1024:.0f}KB "
+                f"transferred in {stats['requests']:.0f} requests, ready after "
+                f"{stats['elapsed_ms']:.0f}ms (p95 {stats['elapsed_ms_p95']:.0f}ms)"
+            )
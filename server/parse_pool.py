@@ -0,0 +1,132 @@
+# parse_pool.py
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, List, Optional, Tuple
+
+from extraction import ContentExtractor, PlatformRule, register_platform, registered_platforms
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Extractor of the current worker process, set up once by _init_worker
+_worker_extractor: Optional[ContentExtractor] = None
+
+
+def _init_worker(extractor: ContentExtractor, rules: List[PlatformRule]):
+    global _worker_extractor
+    _worker_extractor = extractor
+    # Platforms registered at runtime in the parent are not imported by a fresh worker
+    for rule in rules:
+        register_platform(rule.name, rule.domains, rule.selectors)
+
+
+def _extract_in_worker(html_content: str, url: Optional[str]) -> str:
+    return _worker_extractor.extract(html_content, url)
+
+
+def _worker_ready() -> bool:
+    return _worker_extractor is not None
+
+
+def pool_context():
+    """Start workers from a clean server process rather than forking the threaded parent"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class ExtractionPool:
+    """Parses pages and extracts job content in worker processes
+
+    HTML parsing and condensing are CPU-bound and hold the GIL, so running
+    them on the threads that drive browsers stalls the other drivers. Here
+    the calling thread only ships the page to a worker and waits without
+    the GIL. With workers=0 everything runs inline in the calling thread.
+
+    Workers start on first use, and pages are extracted inline until the
+    first worker has booted, so a short run never waits on process startup.
+    """
+
+    def __init__(self, extractor: ContentExtractor, workers: Optional[int] = None):
+        self.extractor = extractor
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Boot the worker processes in the background"""
+        if not self.workers:
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=pool_context(),
+                initializer=_init_worker, initargs=(self.extractor, registered_platforms())
+            )
+            executor = self._executor
+        executor.submit(_worker_ready).add_done_callback(self._on_started)
+
+    def _on_started(self, future: Future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.warning(f"Extraction workers failed to start, extracting inline: {str(future.exception())}")
+            return
+        logger.info(f"Started {self.workers} extraction worker processes")
+        self._ready.set()
+
+    def submit(self, html_content: str, url: Optional[str] = None) -> Future:
+        """Extract a page in the background, or inline while the workers are starting"""
+        self.start()
+        if not self._ready.is_set():
+            future = Future()
+            try:
+                future.set_result(self.extractor.extract(html_content, url))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        with self._lock:
+            executor = self._executor
+        if executor is None:
+            return self.submit(html_content, url)
+        return executor.submit(_extract_in_worker, html_content, url)
+
+    def extract(self, html_content: str, url: Optional[str] = None) -> str:
+        """Extract a page in a worker, blocking until its text is ready"""
+        return self._result(self.submit(html_content, url), html_content, url)
+
+    def map(self, pages: Iterable[Tuple[str, Optional[str]]]) -> List[str]:
+        """Extract (html, url) pages in parallel, returning texts in input order"""
+        pages = list(pages)
+        futures = [self.submit(html_content, url) for html_content, url in pages]
+        return [self._result(future, html_content, url)
+                for future, (html_content, url) in zip(futures, pages)]
+
+    def _result(self, future: Future, html_content: str, url: Optional[str]) -> str:
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); restart the pool on next use
+            logger.warning(f"Extraction worker pool broke, extracting inline: {str(e)}")
+            self._reset()
+            return self.extractor.extract(html_content, url)
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._ready.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """Stop the worker processes; the pool restarts them if used again"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._ready.clear()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
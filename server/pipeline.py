@@ -0,0 +1,256 @@
+# pipeline.py
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from dedupe import NearDuplicateIndex
+from generation_engine import AsyncGenerationEngine
+from links import JobLinks
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class ScrapeGeneratePipeline:
+    """Streams scraped jobs into cover letter generation through a bounded queue
+
+    Scrapers put finished jobs on the queue while generation requests for
+    earlier batches are still in flight. When generation falls behind the
+    queue fills up and scraping pauses until there is room again.
+
+    With a near-duplicate index, reposts of a job already seen are held back
+    from generation and receive the letter written for the first posting.
+    Postings that fit the resume worse than min_relevance are skipped.
+
+    Scrapes are dispatched to worker threads no faster than each host's
+    concurrency cap allows, so a slow host never ties up the workers other
+    hosts could be using.
+    """
+
+    def __init__(self, generator, batcher, max_in_flight: int = 4,
+                 scrape_workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 sinks: Optional[List] = None, dedupe: Optional[NearDuplicateIndex] = None,
+                 min_relevance: Optional[float] = None):
+        self.generator = generator
+        self.batcher = batcher
+        self.max_in_flight = max_in_flight
+        self.scrape_workers = scrape_workers or generator.scrape_threads()
+        self.queue_size = queue_size or 2 * batcher.max_jobs_per_batch
+        self.sinks = sinks or []
+        self.dedupe = dedupe
+        self.min_relevance = min_relevance
+        # Duplicates waiting on a canonical job, and letters of canonical jobs already generated
+        self._followers: Dict[int, List] = {}
+        self._letters: Dict[int, str] = {}
+        self._results: List[Optional[Dict]] = []
+
+    def run(self, urls: List[str]) -> List[Dict]:
+        """Synchronous entry point for callers outside an event loop"""
+        return asyncio.run(self.arun(urls))
+
+    async def arun(self, urls: List[str]) -> List[Dict]:
+        """Scrape and generate for every URL, returning results in input order"""
+        results: List[Optional[Dict]] = [None] * len(urls)
+        if not urls:
+            return []
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        start = time.monotonic()
+        self._results, self._followers, self._letters = results, {}, {}
+
+        with ThreadPoolExecutor(max_workers=self.scrape_workers,
+                                thread_name_prefix='scrape') as scrape_executor:
+            async with AsyncGenerationEngine(self.generator, self.max_in_flight) as engine:
+                producer = asyncio.create_task(self._produce(urls, queue, scrape_executor))
+                await self._consume(queue, engine, results)
+                await producer
+
+        logger.info(f"Pipeline finished {len(urls)} jobs in {time.monotonic() - start:.1f}s")
+        if self.dedupe:
+            self.dedupe.log_summary()
+        return results
+
+    async def _produce(self, urls: List[str], queue: asyncio.Queue, executor: ThreadPoolExecutor):
+        """Scrape URLs with bounded concurrency, blocking while the queue is full"""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.scrape_workers)
+        scrapes: Dict[str, asyncio.Future] = {}
+        politeness = self.generator.politeness
+        host_slots: Dict[str, asyncio.Semaphore] = {}
+
+        def host_slot(url):
+            key = politeness.host_key(url)
+            if key not in host_slots:
+                cap = politeness.policy_for(key).max_concurrent if politeness.enabled else self.scrape_workers
+                host_slots[key] = asyncio.Semaphore(cap)
+            return host_slots[key]
+
+        async def scrape(index, url):
+            key = JobLinks.clean_url(url)
+            if key in scrapes:
+                # The same posting listed twice is only scraped once
+                await queue.put((index, url, await scrapes[key]))
+                return
+            scrapes[key] = loop.create_future()
+            try:
+                # The host's turn comes first, so waiting on one host never holds a worker
+                async with host_slot(url):
+                    await slots.acquire()
+                    try:
+                        content = await loop.run_in_executor(executor, self.generator.scrape_job_content, url)
+                    except BaseException:
+                        slots.release()
+                        raise
+            except Exception as e:
+                scrapes[key].set_exception(e)
+                raise
+            try:
+                scrapes[key].set_result(content)
+                # Keep the scrape slot until the queue has room, so scraping pauses under backpressure
+                await queue.put((index, url, content))
+            finally:
+                slots.release()
+
+        try:
+            await asyncio.gather(*(scrape(i, url) for i, url in enumerate(urls)))
+        finally:
+            await queue.put(_DONE)
+
+    async def _consume(self, queue: asyncio.Queue, engine: AsyncGenerationEngine,
+                       results: List[Optional[Dict]]):
+        """Pack scraped jobs into batches and dispatch each as soon as it is full"""
+        pending = set()
+        batch, batch_tokens = [], []
+        batch_number = 0
+
+        async def dispatch(jobs):
+            nonlocal batch_number
+            batch_number += 1
+            # Wait for a request slot so a slow provider pushes back on scraping
+            while len(pending) >= self.max_in_flight:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for finished in done:
+                    finished.result()  # Re-raise anything _generate did not handle
+            task = asyncio.create_task(self._generate(engine, jobs, results, batch_number))
+            pending.add(task)
+
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            index, url, content = item
+            content = self.batcher.fit(content)
+            if self._skip_irrelevant(index, url, content) or self._hold_duplicate(index, url, content):
+                continue
+            tokens = self.batcher.job_tokens(content)
+            if batch and not self.batcher.fits(batch_tokens, tokens):
+                await dispatch(batch)
+                batch, batch_tokens = [], []
+            batch.append((index, url, content))
+            batch_tokens.append(tokens)
+            if len(batch) >= self.batcher.max_jobs_per_batch:
+                await dispatch(batch)
+                batch, batch_tokens = [], []
+
+        if batch:
+            await dispatch(batch)
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def _generate(self, engine: AsyncGenerationEngine, jobs, results, batch_number: int):
+        """Generate one batch and store its letters at their input positions
+
+        If anything fails on the way, every job of the batch (and its
+        duplicates) still gets a result, with an error in place of a letter.
+        """
+        try:
+            await self._generate_batch(engine, jobs, results, batch_number)
+        except Exception as e:
+            logger.error(f"Error generating batch {batch_number}: {str(e)}")
+            failed = []
+            for index, url, content in jobs:
+                self._letters.setdefault(index, "Error generating cover letter")
+                if results[index] is None:
+                    results[index] = self._result(url, content, "Error generating cover letter")
+                    failed.append(results[index])
+                for follower_index, follower_url, follower_content in self._followers.pop(index, []):
+                    results[follower_index] = self._result(follower_url, follower_content,
+                                                           "Error generating cover letter")
+                    failed.append(results[follower_index])
+            self._write(failed, batch_number)
+
+    async def _generate_batch(self, engine: AsyncGenerationEngine, jobs, results, batch_number: int):
+        delivered = set()
+
+        def on_letter(position, letter):
+            # Runs on the generation thread as soon as a letter is available
+            index, url, content = jobs[position]
+            delivered.add(position)
+            self._write([self._result(url, content, letter)], batch_number)
+
+        letters = await engine.generate([content for _, _, content in jobs], str(batch_number),
+                                        on_letter=on_letter if self.sinks else None,
+                                        job_labels=[url for _, url, _ in jobs])
+        undelivered = []
+        for position, ((index, url, content), letter) in enumerate(zip(jobs, letters)):
+            results[index] = self._result(url, content, letter)
+            if position not in delivered:
+                undelivered.append(results[index])
+            self._letters[index] = letter
+            for follower_index, follower_url, follower_content in self._followers.pop(index, []):
+                results[follower_index] = self._result(follower_url, follower_content, letter)
+                undelivered.append(results[follower_index])
+        self._write(undelivered, batch_number)
+
+    def _skip_irrelevant(self, index: int, url: str, content: str) -> bool:
+        """Record a posting that fits the resume too poorly as skipped instead of generating for it"""
+        if self.min_relevance is None or content.startswith('Error'):
+            return False
+        # Scored on its own so the cut-off does not depend on which jobs arrived first
+        score = float(self.generator.relevance_scores([content], corpus_idf=False)[0])
+        if score >= self.min_relevance:
+            return False
+        logger.info(f"Skipping {url}: relevance {score:.3f} is below {self.min_relevance}")
+        result = self._result(url, content, f"Skipped: relevance {score:.3f} below {self.min_relevance}")
+        self._results[index] = result
+        self._write([result], 'of skipped jobs')
+        return True
+
+    def _hold_duplicate(self, index: int, url: str, content: str) -> bool:
+        """Attach a near-duplicate posting to its canonical job instead of generating for it"""
+        if self.dedupe is None or content.startswith('Error'):
+            return False
+        canonical = self.dedupe.add(index, content)
+        if canonical is None:
+            return False
+        logger.info(f"{url} is a near-duplicate of job {canonical + 1}, reusing its letter")
+        if canonical in self._letters:
+            result = self._result(url, content, self._letters[canonical])
+            self._results[index] = result
+            self._write([result], 'of duplicates')
+        else:
+            self._followers.setdefault(canonical, []).append((index, url, content))
+        return True
+
+    @staticmethod
+    def _result(url: str, content: str, letter: str) -> Dict:
+        return {
+            'job_link': url,
+            'job_content': content,
+            'cover_letter': letter
+        }
+
+    def _write(self, finished: List[Dict], batch_number):
+        """Hand results to every sink"""
+        if not finished:
+            return
+        for sink in self.sinks:
+            try:
+                sink.write(finished)
+            except Exception as e:
+                logger.error(f"Error writing batch {batch_number} to {type(sink).__name__}: {str(e)}")
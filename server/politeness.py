@@ -0,0 +1,149 @@
+# politeness.py
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from links import JobLinks
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class HostPolicy:
+    """How hard one job board may be hit: requests in flight and gap between their starts"""
+
+    def __init__(self, max_concurrent: int = 1, min_interval: float = 2.0):
+        if max_concurrent < 1:
+            raise ValueError("A host must allow at least one request at a time")
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+
+    def __repr__(self):
+        return f"HostPolicy(max_concurrent={self.max_concurrent}, min_interval={self.min_interval})"
+
+
+# Keyed by JobLinks.get_source_type; every unknown domain gets its own 'Other' allowance
+DEFAULT_HOST_POLICIES = {
+    'LinkedIn': HostPolicy(max_concurrent=1, min_interval=3.0),
+    'Greenhouse': HostPolicy(max_concurrent=2, min_interval=1.0),
+    'Ashby': HostPolicy(max_concurrent=2, min_interval=1.0),
+    'ClimateBase': HostPolicy(max_concurrent=1, min_interval=2.0),
+    'Other': HostPolicy(max_concurrent=2, min_interval=1.0),
+}
+
+
+class PolitenessScheduler:
+    """Per-host concurrency caps and minimum start intervals for page fetches
+
+    Each host only waits on its own allowance, so fetches for different
+    hosts proceed side by side and total throughput approaches the sum of
+    the hosts' allowances. A slot is reserved before its wait starts, so
+    waiting requests count against the host's concurrency cap.
+    """
+
+    def __init__(self, policies: Optional[Dict[str, HostPolicy]] = None, enabled: bool = True):
+        self.policies = dict(DEFAULT_HOST_POLICIES)
+        self.policies.update(policies or {})
+        self.enabled = enabled
+        self._condition = threading.Condition()
+        self._active: Dict[str, int] = defaultdict(int)
+        self._next_start: Dict[str, float] = defaultdict(float)
+        self._stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {'requests': 0, 'waited': 0.0})
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Scheduling key of a URL: its job board, or its domain for other sites"""
+        source = JobLinks.get_source_type(url)
+        if source != 'Other':
+            return source
+        return f"Other:{urlparse(url).netloc.lower()}"
+
+    def policy_for(self, key: str) -> HostPolicy:
+        """Policy of a scheduling key; 'Other:<domain>' may be given its own policy"""
+        return self.policies.get(key) or self.policies.get(key.split(':', 1)[0], self.policies['Other'])
+
+    def _reserve(self, key: str) -> Optional[float]:
+        """Reserve the host's next start time, returning the wait until it, or None at the cap"""
+        policy = self.policy_for(key)
+        if self._active[key] >= policy.max_concurrent:
+            return None
+        now = time.monotonic()
+        start = max(now, self._next_start[key])
+        self._active[key] += 1
+        self._next_start[key] = start + policy.min_interval
+        return start - now
+
+    def _release(self, key: str):
+        with self._condition:
+            self._active[key] -= 1
+            self._condition.notify_all()
+
+    def _record(self, key: str, waited: float):
+        with self._condition:
+            self._stats[key]['requests'] += 1
+            self._stats[key]['waited'] += waited
+
+    @contextmanager
+    def slot(self, url: str):
+        """Block until the URL's host may be fetched, holding its slot for the block"""
+        if not self.enabled:
+            yield
+            return
+        key = self.host_key(url)
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                wait = self._reserve(key)
+                if wait is not None:
+                    break
+                self._condition.wait()
+        try:
+            if wait > 0:
+                time.sleep(wait)
+            self._record(key, time.monotonic() - start)
+            yield
+        finally:
+            self._release(key)
+
+    def interleave(self, urls: List[str]) -> List[int]:
+        """Indexes of urls in round-robin order across hosts, each host's own order kept
+
+        Feeding a fixed set of workers in this order keeps one host's backlog
+        from occupying every worker while other hosts sit idle.
+        """
+        queues: Dict[str, deque] = {}
+        for index, url in enumerate(urls):
+            queues.setdefault(self.host_key(url), deque()).append(index)
+        order = []
+        while queues:
+            for key in list(queues):
+                order.append(queues[key].popleft())
+                if not queues[key]:
+                    del queues[key]
+        return order
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-host fetch count and time spent waiting for a slot, in seconds"""
+        with self._condition:
+            stats = {key: dict(values) for key, values in self._stats.items()}
+        return {
+            key: {
+                'requests': int(values['requests']),
+                'waited': values['waited'],
+                'mean_wait': values['waited'] / values['requests'] if values['requests'] else 0.0,
+            }
+            for key, values in sorted(stats.items())
+        }
+
+    def log_summary(self):
+        for key, stats in self.summary().items():
+            policy = self.policy_for(key)
+            logger.info(
+                f"{key}: {stats['requests']} fetches, waited {stats['waited']:.1f}s "
+                f"(mean {stats['mean_wait']:.2f}s) under {policy.max_concurrent} concurrent, "
+                f"{policy.min_interval:.1f}s apart"
+            )
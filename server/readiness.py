@@ -0,0 +1,155 @@
+# readiness.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from links import JobLinks
+from stats import percentile
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Elements that only exist once the job description has rendered
+PLATFORM_READY_SELECTORS = {
+    'LinkedIn': [
+        '.jobs-description-content__text',
+        '.description__text',
+        '.jobs-box__html-content',
+        '.show-more-less-html__markup',
+    ],
+    'Greenhouse': [
+        '.job__description',
+        '#job_description',
+        '.greenhouse-job-description',
+    ],
+    'Ashby': [
+        '.job-description-section',
+        '[class*="_descriptionText"]',
+        '[data-testid="job-description"]',
+    ],
+    'ClimateBase': [
+        '.job-details',
+        '.job-description',
+        '[data-testid="job-description"]',
+    ],
+    'Other': [
+        '#job-description',
+        '.job-description',
+        '[data-testid="job-description"]',
+    ],
+}
+
+DOM_SIZE_SCRIPT = "return document.body ? document.body.innerHTML.length : 0;"
+READY_STATE_SCRIPT = "return document.readyState;"
+
+
+class PageReadiness:
+    """Waits until a job page is usable instead of sleeping a fixed time"""
+
+    def __init__(self, timeout: float = 10, poll_interval: float = 0.1,
+                 stable_for: float = 0.5, adaptive: bool = True,
+                 min_timeout: float = 2, min_samples: int = 5):
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.stable_for = stable_for
+        self.adaptive = adaptive
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._timings: Dict[str, List[float]] = defaultdict(list)
+        self._outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def timeout_for(self, platform: str) -> float:
+        """Timeout ceiling for a platform, tightened once its pages are measured"""
+        if not self.adaptive:
+            return self.timeout
+        with self._lock:
+            timings = list(self._timings.get(platform, []))
+        if len(timings) < self.min_samples:
+            return self.timeout
+        return min(self.timeout, max(self.min_timeout, 3 * percentile(timings, 95)))
+
+    def _condition(self, selectors: Optional[List[str]], stable_for: float):
+        """Build a wait condition: description selector present or DOM stopped changing"""
+        combined = ', '.join(selectors) if selectors else None
+        state = {'size': None, 'since': None}
+
+        def ready(driver):
+            if combined and driver.find_elements(By.CSS_SELECTOR, combined):
+                return 'selector'
+            if driver.execute_script(READY_STATE_SCRIPT) == 'loading':
+                return False
+            size = driver.execute_script(DOM_SIZE_SCRIPT)
+            now = time.monotonic()
+            if state['since'] is None or size != state['size']:
+                state['size'], state['since'] = size, now
+                return False
+            if now - state['since'] >= stable_for:
+                return 'stable'
+            return False
+
+        return ready
+
+    def wait(self, driver, url: str) -> str:
+        """Block until the page at url is ready, returning why the wait ended"""
+        platform = JobLinks.get_source_type(url)
+        timeout = self.timeout_for(platform)
+        selectors = PLATFORM_READY_SELECTORS.get(platform, PLATFORM_READY_SELECTORS['Other'])
+
+        start = time.monotonic()
+        try:
+            outcome = WebDriverWait(driver, timeout, poll_frequency=self.poll_interval).until(
+                self._condition(selectors, self.stable_for)
+            )
+        except TimeoutException:
+            outcome = 'timeout'
+        elapsed = time.monotonic() - start
+
+        self.record(platform, elapsed, outcome)
+        logger.info(f"{platform} page ready in {elapsed * 1000:.0f}ms ({outcome})")
+        return outcome
+
+    def settle(self, driver, timeout: float = 1.0) -> str:
+        """Wait for the DOM to stop changing after a scroll or click"""
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=self.poll_interval).until(
+                self._condition(None, min(self.stable_for, timeout / 2))
+            )
+        except TimeoutException:
+            return 'timeout'
+
+    def record(self, platform: str, elapsed: float, outcome: str):
+        with self._lock:
+            self._timings[platform].append(elapsed)
+            self._outcomes[platform][outcome] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-platform wait statistics in seconds"""
+        with self._lock:
+            timings = {p: list(t) for p, t in self._timings.items()}
+            outcomes = {p: dict(o) for p, o in self._outcomes.items()}
+        return {
+            platform: {
+                'pages': len(values),
+                'mean': sum(values) / len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'max': max(values),
+                'outcomes': outcomes.get(platform, {}),
+            }
+            for platform, values in timings.items()
+        }
+
+    def log_summary(self):
+        for platform, stats in self.summary().items():
+            logger.info(
+                f"{platform}: {stats['pages']} pages, mean {stats['mean'] * 1000:.0f}ms, "
+                f"p95 {stats['p95'] * 1000:.0f}ms, max {stats['max'] * 1000:.0f}ms, "
+                f"outcomes {stats['outcomes']}"
+            )
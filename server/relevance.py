@@ -0,0 +1,255 @@
+# relevance.py
+import hashlib
+import logging
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Letters, digits, '+' and '#' (so c++ and c# survive), in any script
+TERM_RE = re.compile(r'(?:[^\W_]|[+#])+')
+# Non-ASCII characters that are not letters or digits, such as dashes and curly quotes
+NON_ASCII_SEPARATOR_RE = re.compile(r'[^\x00-\x7f\w]')
+TERM_BYTES = np.zeros(256, dtype=bool)
+for _byte in b'abcdefghijklmnopqrstuvwxyz0123456789+#':
+    TERM_BYTES[_byte] = True
+# UTF-8 bytes of non-ASCII letters and digits; lowered_bytes blanks out the rest
+TERM_BYTES[0x80:] = True
+ASCII_LOWER = np.arange(256, dtype=np.uint8)
+ASCII_LOWER[ord('A'):ord('Z') + 1] += 32
+# Terms up to this many bytes are covered exactly by their first and last eight bytes
+EXACT_KEY_BYTES = 16
+# LOW_BYTES[n] keeps the lowest n bytes of a uint64
+LOW_BYTES = np.array([(1 << (8 * n)) - 1 for n in range(8)] + [2 ** 64 - 1], dtype=np.uint64)
+# Postings are counted in chunks to bound the size of the intermediate arrays
+CHUNK_BYTES = 4 * 1024 * 1024
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can could did do does
+for from had has have having he her his how i if in into is it its just me more most my no not
+of on or our out over own she so some such than that the their them then there these they this
+those through to too under up very was we were what when where which while who will with would
+you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased terms, keeping tokens such as c++ and c# intact"""
+    return TERM_RE.findall(text.lower())
+
+
+def term_keys(buffer: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Start offset, end offset and 64-bit key of every term in lower-cased UTF-8 bytes
+
+    A key mixes a term's length with its first and last eight bytes, which
+    covers terms of up to 16 bytes exactly, and is computed for all terms at
+    once without a Python loop over tokens. Longer terms, which are rare,
+    would collide whenever their ends match, so they are keyed by a hash of
+    all their bytes instead.
+    """
+    is_term = TERM_BYTES[buffer]
+    edges = np.diff(is_term.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+
+    # Every byte offset read as a little-endian uint64 (unaligned, strided view)
+    padded = np.concatenate((np.zeros(8, dtype=np.uint8), buffer, np.zeros(8, dtype=np.uint8)))
+    words = np.ndarray(shape=(len(padded) - 7,), dtype='<u8', buffer=padded, strides=(1,))
+    clipped = np.minimum(lengths, 8)
+    # Blank out bytes outside short terms so only the term itself is keyed
+    head = words[starts + 8] & LOW_BYTES[clipped]
+    tail = words[ends] & ~LOW_BYTES[8 - clipped]
+    with np.errstate(over='ignore'):
+        keys = (head * np.uint64(0x9E3779B97F4A7C15)
+                ^ tail * np.uint64(0xC2B2AE3D27D4EB4F)
+                ^ lengths.astype(np.uint64))
+    long_terms = np.flatnonzero(lengths > EXACT_KEY_BYTES)
+    if len(long_terms):
+        data = buffer.tobytes()
+        keys[long_terms] = [
+            int.from_bytes(hashlib.blake2b(data[starts[i]:ends[i]], digest_size=8).digest(), 'little')
+            for i in long_terms
+        ]
+    return starts, ends, keys
+
+
+def lowered_bytes(text: str) -> np.ndarray:
+    """Lower-cased UTF-8 bytes of text, with non-ASCII punctuation replaced by spaces
+
+    Every byte of a multi-byte character counts as a term byte, so characters
+    such as em dashes and curly quotes are blanked out here rather than
+    joining the words on either side into one term.
+    """
+    if text.isascii():
+        # Cheaper than str.lower() when no character needs Unicode case rules
+        return ASCII_LOWER[np.frombuffer(text.encode('ascii'), dtype=np.uint8)]
+    text = NON_ASCII_SEPARATOR_RE.sub(' ', text.lower())
+    return np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+
+
+def profile_terms(text: str) -> List[str]:
+    return [term for term in tokenize(text) if term not in STOPWORDS and len(term) > 1]
+
+
+class RelevanceScorer:
+    """BM25 relevance of job postings to a resume profile, as sparse matrix products
+
+    Only terms that occur in the profile can contribute to a score, so
+    postings are counted against the profile's vocabulary alone and every
+    posting in a set is scored at once.
+    """
+
+    def __init__(self, profile: Dict, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.skills = list(profile.get('skill_matrix') or [])
+        self.achievements = list(profile.get('achievement_candidates')
+                                 or profile.get('key_achievements') or [])
+
+        query = ' '.join([profile.get('professional_summary') or ''] + self.achievements + self.skills)
+        self.vocabulary: Dict[str, int] = {}
+        # Only whole terms, so every vocabulary entry gets exactly one lookup key
+        for term in profile_terms(query) + [term for skill in self.skills for term in tokenize(skill)]:
+            self.vocabulary.setdefault(term, len(self.vocabulary))
+        if not self.vocabulary:
+            self.vocabulary[''] = 0
+        self._build_lookup()
+        self.query = self._counts([query]).sign().toarray().ravel()
+        self.skill_matrix = self._counts(self.skills).sign()
+        self.achievement_matrix = self._counts(self.achievements).sign()
+
+    def _build_lookup(self):
+        """Collision-free open table from term keys to vocabulary ids"""
+        terms = '\0'.join(self.vocabulary)
+        _, _, keys = term_keys(np.frombuffer(terms.encode('utf-8'), dtype=np.uint8))
+        bits = max(8, (4 * len(keys)).bit_length())
+        while True:
+            slots = (keys >> np.uint64(64 - bits)).astype(np.int64)
+            if len(np.unique(slots)) == len(slots):
+                break
+            bits += 1
+        self._lookup_shift = np.uint64(64 - bits)
+        self._lookup_keys = np.zeros(1 << bits, dtype=np.uint64)
+        self._lookup_ids = np.full(1 << bits, -1, dtype=np.int64)
+        self._lookup_keys[slots] = keys
+        self._lookup_ids[slots] = np.arange(len(keys))
+
+    def _counts(self, texts: Sequence[str], lengths: Optional[np.ndarray] = None) -> sparse.csr_matrix:
+        """Document-by-term counts over the profile vocabulary"""
+        rows, cols = [], []
+        step = self._chunk_docs(texts)
+        for first in range(0, len(texts), step):
+            chunk = texts[first:first + step]
+            joined = '\0'.join(chunk)
+            if joined.count('\0') != len(chunk) - 1:
+                joined = '\0'.join(text.replace('\0', ' ') for text in chunk)
+            buffer = lowered_bytes(joined)
+            starts, ends, keys = term_keys(buffer)
+            # NUL is not a term byte, so terms never run across documents
+            separators = np.flatnonzero(buffer == 0)
+            if lengths is not None:
+                boundaries = np.concatenate(([0], np.searchsorted(starts, separators), [len(starts)]))
+                lengths[first:first + len(chunk)] = np.diff(boundaries)
+
+            slots = (keys >> self._lookup_shift).astype(np.int64)
+            ids = self._lookup_ids[slots]
+            known = np.flatnonzero((self._lookup_keys[slots] == keys) & (ids >= 0))
+            rows.append(np.searchsorted(separators, starts[known]) + first)
+            cols.append(ids[known])
+
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+        data = np.ones(len(cols), dtype=np.float64)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(texts), len(self.vocabulary)))
+
+    @staticmethod
+    def _chunk_docs(texts: Sequence[str]) -> int:
+        average = sum(len(text) for text in texts[:100]) / max(min(len(texts), 100), 1)
+        return max(1, int(CHUNK_BYTES // max(average, 1)))
+
+    def weights(self, job_contents: Sequence[str],
+                corpus_idf: bool = True) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """BM25 term weights for each posting, and the IDF of every profile term
+
+        With corpus_idf, terms are weighted by their document frequency across
+        the postings scored together and lengths are normalised by their mean.
+        Otherwise every profile term counts the same and each posting is its
+        own length reference, so a posting's weights do not depend on the
+        others. Nothing is stored on the scorer, so one scorer can be shared
+        between threads.
+        """
+        lengths = np.zeros(len(job_contents), dtype=np.float64)
+        counts = self._counts(job_contents, lengths)
+        count = len(job_contents)
+        if corpus_idf:
+            document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+            idf = np.log1p((count - document_frequency + 0.5) / (document_frequency + 0.5))
+        else:
+            idf = np.ones(counts.shape[1])
+
+        if corpus_idf:
+            average_length = lengths.mean() if count and lengths.mean() else 1.0
+        else:
+            average_length = np.maximum(lengths, 1.0)
+        norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        row_norm = np.repeat(norm, np.diff(counts.indptr))
+        tf = counts.data
+        counts.data = tf * (self.k1 + 1) / (tf + row_norm) * idf[counts.indices]
+        return counts, idf
+
+    def scores(self, job_contents: Sequence[str], weights: Optional[sparse.csr_matrix] = None,
+               idf: Optional[np.ndarray] = None, corpus_idf: bool = True) -> np.ndarray:
+        """Relevance of each posting in [0, 1], as a fraction of the best possible BM25 score
+
+        weights and idf, if given, are the pair returned by weights().
+        """
+        if not len(job_contents):
+            return np.zeros(0)
+        if weights is None or idf is None:
+            weights, idf = self.weights(job_contents, corpus_idf)
+        raw = weights @ self.query
+        best = (self.k1 + 1) * float(idf @ self.query)
+        return raw / best if best else np.zeros(len(job_contents))
+
+    def rank(self, job_contents: Sequence[str], min_score: Optional[float] = None) -> List[Tuple[int, float]]:
+        """(index, score) of postings from best to worst fit, dropping those below min_score"""
+        scores = self.scores(job_contents)
+        order = np.argsort(-scores, kind='stable')
+        return [(int(i), float(scores[i])) for i in order
+                if min_score is None or scores[i] >= min_score]
+
+    def select(self, job_contents: Sequence[str], top_achievements: int = 3,
+               top_skills: int = 12) -> List[Dict]:
+        """Score every posting and pick the achievements and skills most relevant to each
+
+        Each posting is scored on its own, so the evidence a job is sent does
+        not change with the other jobs in its batch.
+        """
+        if not len(job_contents):
+            return []
+        weights, idf = self.weights(job_contents, corpus_idf=False)
+        scores = self.scores(job_contents, weights, idf)
+
+        achievement_fit = np.zeros((len(job_contents), len(self.achievements)))
+        if self.achievements:
+            # Dividing by sqrt(length) keeps long lines from winning on term count alone
+            lengths = np.sqrt(np.maximum(self.achievement_matrix.getnnz(axis=1), 1))
+            achievement_fit = (weights @ self.achievement_matrix.T).toarray() / lengths
+        skill_fit = ((weights @ self.skill_matrix.T).toarray() if self.skills
+                     else np.zeros((len(job_contents), 0)))
+
+        selections = []
+        for row in range(len(job_contents)):
+            achievements = np.argsort(-achievement_fit[row], kind='stable')[:top_achievements]
+            matched = [i for i in np.argsort(-skill_fit[row], kind='stable') if skill_fit[row, i] > 0]
+            skills = matched[:top_skills] or list(range(min(top_skills, len(self.skills))))
+            selections.append({
+                'relevance': round(float(scores[row]), 3),
+                'key_achievements': [self.achievements[i].strip() for i in sorted(achievements)],
+                'skill_matrix': [self.skills[i] for i in skills]
+            })
+        return selections
@@ -0,0 +1,153 @@
+# resume_profile.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever the extraction rules change so stale artifacts are rebuilt
+PROFILE_VERSION = 2
+
+SUMMARY_RE = re.compile(r'(Professional Summary|Career Objective):(.*?)(?:\n\n|\Z)',
+                        re.DOTALL | re.IGNORECASE)
+
+ACHIEVEMENT_KEYWORDS = [
+    'Achieved', 'Increased', 'Improved', 'Led', 'Developed',
+    'Launched', 'Reduced', 'Optimized', 'Transformed'
+]
+# Zero-width lookahead so every keyword sees every line, in a single scan
+ACHIEVEMENT_RE = re.compile(
+    r'(?=((' + '|'.join(ACHIEVEMENT_KEYWORDS) + r').*?(?:\n|$)))', re.IGNORECASE
+)
+
+# Lookahead again, so a "Technical Skills:" section is also seen as a plain "Skills:" one
+SKILL_SECTION_RE = re.compile(r'(?=(?:(Technical|Professional) )?Skills:(.*?)(?:\n\n|\Z))',
+                              re.DOTALL | re.IGNORECASE)
+WORD_RE = re.compile(r'\b\w+\b')
+
+
+def extract_professional_summary(resume: str) -> str:
+    """Extract a concise professional summary"""
+    summary_match = SUMMARY_RE.search(resume)
+    return summary_match.group(2).strip() if summary_match else resume[:500]
+
+
+def extract_key_achievements(resume: str, per_keyword: int = 3, limit: Optional[int] = 5) -> List[str]:
+    """Extract top career achievements, up to per_keyword lines for each keyword"""
+    by_keyword = {keyword.lower(): [] for keyword in ACHIEVEMENT_KEYWORDS}
+    next_start = dict.fromkeys(by_keyword, 0)
+
+    for match in ACHIEVEMENT_RE.finditer(resume):
+        keyword = match.group(2).lower()
+        # Matches for the same keyword must not overlap, as with re.findall
+        if match.start() < next_start[keyword]:
+            continue
+        line = match.group(1)
+        next_start[keyword] = match.start() + max(len(line), 1)
+        if len(by_keyword[keyword]) < per_keyword:
+            by_keyword[keyword].append(line)
+
+    achievements = []
+    for keyword in ACHIEVEMENT_KEYWORDS:
+        achievements.extend(by_keyword[keyword.lower()])
+    return achievements[:limit]
+
+
+def create_skill_matrix(resume: str) -> List[str]:
+    """Create a structured skill matrix from the resume's skill sections"""
+    sections = {}
+    for match in SKILL_SECTION_RE.finditer(resume):
+        kind = (match.group(1) or '').lower()
+        # The first section of any kind also counts as the plain "Skills:" section
+        sections.setdefault('', match.group(2))
+        sections.setdefault(kind, match.group(2))
+        if len(sections) == 3:
+            break
+
+    skills = {}
+    for kind in ('', 'technical', 'professional'):
+        if kind in sections:
+            skills.update({skill.lower(): True for skill in WORD_RE.findall(sections[kind])})
+    return list(skills.keys())
+
+
+def build_profile(resume: str) -> Dict:
+    """Compute the professional context used in every generation prompt"""
+    return {
+        "professional_summary": extract_professional_summary(resume),
+        "key_achievements": extract_key_achievements(resume),
+        "skill_matrix": create_skill_matrix(resume),
+        # Every achievement line, for choosing the most relevant ones per job
+        "achievement_candidates": extract_key_achievements(resume, limit=None)
+    }
+
+
+def resume_hash(resume: str) -> str:
+    return hashlib.sha256(resume.encode('utf-8')).hexdigest()
+
+
+class ResumeProfileStore:
+    """Builds each resume's profile once and persists it as a versioned artifact"""
+
+    def __init__(self, cache_dir: Optional[str] = '.profile_cache'):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Dict] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.v{PROFILE_VERSION}.json")
+
+    def get(self, resume: str) -> Dict:
+        """Return the profile for a resume, building and saving it on first use"""
+        digest = resume_hash(resume)
+        with self._lock:
+            if digest in self._profiles:
+                return self._profiles[digest]
+
+            profile = self._load(digest)
+            if profile is None:
+                profile = build_profile(resume)
+                self._save(digest, profile)
+            self._profiles[digest] = profile
+            return profile
+
+    def _load(self, digest: str) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(digest), 'r') as f:
+                artifact = json.load(f)
+            if artifact.get('version') != PROFILE_VERSION or artifact.get('resume_sha256') != digest:
+                return None
+            logger.info(f"Loaded resume profile {digest[:12]}")
+            return artifact['profile']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable resume profile {digest[:12]}: {str(e)}")
+            return None
+
+    def _save(self, digest: str, profile: Dict):
+        if not self.cache_dir:
+            return
+        artifact = {
+            'version': PROFILE_VERSION,
+            'resume_sha256': digest,
+            'profile': profile,
+        }
+        path = self._path(digest)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(artifact, f, indent=2)
+            os.replace(tmp_path, path)
+            logger.info(f"Saved resume profile {digest[:12]}")
+        except Exception as e:
+            logger.warning(f"Could not save resume profile: {str(e)}")
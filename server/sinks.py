@@ -0,0 +1,171 @@
+# sinks.py
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULT_FIELDS = ['job_link', 'job_content', 'cover_letter']
+
+
+class ResultSink:
+    """Destination that receives job results incrementally as batches finish"""
+
+    def write(self, results: List[Dict]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlSink(ResultSink):
+    """Appends one JSON object per result to a file"""
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+
+    def write(self, results: List[Dict]):
+        if not results:
+            return
+        lines = ''.join(
+            json.dumps(dict(result, recorded_at=time.time()), ensure_ascii=False) + '\n'
+            for result in results
+        )
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+
+class SqliteSink(ResultSink):
+    """Inserts results into a SQLite table, one transaction per batch"""
+
+    def __init__(self, path: str, table: str = 'results'):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " job_link TEXT, job_content TEXT, cover_letter TEXT, recorded_at REAL)"
+        )
+        self._conn.commit()
+
+    def write(self, results: List[Dict]):
+        rows = [tuple(result.get(field) for field in RESULT_FIELDS) + (time.time(),)
+                for result in results]
+        with self._lock:
+            self._conn.executemany(f"INSERT INTO {self.table} VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ParquetSink(ResultSink):
+    """Buffers results and writes them to a Parquet file one row group at a time"""
+
+    def __init__(self, path: str, row_group_size: int = 500):
+        if pq is None:
+            raise ImportError("ParquetSink requires pyarrow")
+        self.path = path
+        self.row_group_size = row_group_size
+        self.schema = pa.schema([(field, pa.string()) for field in RESULT_FIELDS])
+        self._lock = threading.Lock()
+        self._buffer: List[Dict] = []
+        self._writer = None
+
+    def write(self, results: List[Dict]):
+        with self._lock:
+            self._buffer.extend(results)
+            if len(self._buffer) >= self.row_group_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        columns = {field: [result.get(field) for result in self._buffer] for field in RESULT_FIELDS}
+        self._writer.write_table(pa.table(columns, schema=self.schema))
+        self._buffer = []
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+def read_results(source: str) -> Iterable[Dict]:
+    """Read results back from a JSONL, SQLite or Parquet sink file"""
+    extension = os.path.splitext(source)[1].lower()
+    if extension in ('.sqlite', '.db'):
+        conn = sqlite3.connect(source)
+        try:
+            for row in conn.execute(f"SELECT {', '.join(RESULT_FIELDS)} FROM results"):
+                yield dict(zip(RESULT_FIELDS, row))
+        finally:
+            conn.close()
+    elif extension == '.parquet':
+        if pq is None:
+            raise ImportError("Reading Parquet results requires pyarrow")
+        yield from pq.read_table(source).to_pylist()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+
+def export_to_excel(source: Union[str, List[Dict]], output_path: str, latest_only: bool = True):
+    """Write results (or a sink file's contents) to an Excel workbook"""
+    import pandas as pd
+
+    results = read_results(source) if isinstance(source, str) else source
+    if latest_only:
+        # Reruns append to sinks; keep the last result recorded for each job
+        results = list({result['job_link']: result for result in results}.values())
+    df = pd.DataFrame(list(results), columns=RESULT_FIELDS)
+    df.to_excel(output_path, index=False)
+    logger.info(f"Exported {len(df)} results to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export streamed cover letter results to Excel')
+    parser.add_argument('source', help='JSONL, SQLite or Parquet results file')
+    parser.add_argument('output', help='Excel file to write')
+    args = parser.parse_args()
+    export_to_excel(args.source, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# streaming.py
+import json
+import logging
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MARKER_RE = re.compile(r'### COVER LETTER FOR JOB (\d+) ###')
+# Longest text that could still turn out to be the start of a marker
+MARKER_LOOKBEHIND = len('### COVER LETTER FOR JOB 99999 ###')
+
+
+def format_marker(number: int) -> str:
+    return f"### COVER LETTER FOR JOB {number} ###"
+
+
+class CoverLetterStreamParser:
+    """Splits a streamed completion into letters as their closing markers arrive
+
+    Only the letter currently being written is buffered; finished letters
+    are handed back from feed() and dropped from the parser.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._current: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[int, str]]:
+        """Add streamed text, returning (job number, letter) for letters now closed"""
+        self._buffer += text
+        finished = []
+        while True:
+            match = MARKER_RE.search(self._buffer)
+            if not match:
+                break
+            if self._current is not None:
+                finished.append((self._current, self._buffer[:match.start()].strip()))
+            self._current = int(match.group(1))
+            self._buffer = self._buffer[match.end():]
+
+        if self._current is None and len(self._buffer) > MARKER_LOOKBEHIND:
+            # Preamble before the first marker is never part of a letter
+            self._buffer = self._buffer[-MARKER_LOOKBEHIND:]
+        return finished
+
+    def finish(self) -> List[Tuple[int, str]]:
+        """Close the stream, returning the last letter if one was open"""
+        finished = self.feed('')
+        if self._current is not None:
+            finished.append((self._current, self._buffer.strip()))
+        self._current = None
+        self._buffer = ''
+        return finished
+
+
+def iter_sse_events(response) -> Iterator[Dict]:
+    """Decode server-sent completion chunks until [DONE]
+
+    A connection closed before [DONE] or any finish_reason raises
+    ConnectionError, so a cut-off completion is not mistaken for a whole one.
+    """
+    finished = False
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            return
+        event = json.loads(data)
+        if any(choice.get('finish_reason') for choice in event.get('choices') or []):
+            finished = True
+        yield event
+    if not finished:
+        raise ConnectionError("Stream closed before [DONE] or a finish_reason")
+
+
+def chunk_text(event: Dict) -> str:
+    """Content delta carried by one streamed chunk"""
+    choices = event.get('choices') or []
+    if not choices:
+        return ''
+    return (choices[0].get('delta') or {}).get('content') or ''
@@ -0,0 +1,377 @@
+# stub_openai.py
+"""Local stand-in for the OpenAI /v1/chat/completions endpoint
+
+Answers every request with one marked cover letter per job in the prompt,
+with configurable latency, 429/5xx fault injection, Retry-After headers,
+usage fields and SSE streaming, so concurrency and batching can be load
+tested with no network and no spend:
+
+    python stub_openai.py --port 8001 --latency lognormal:1.5:0.5 --rate-429 0.05
+
+and point the generator at it with OPENAI_BASE_URL=http://127.0.0.1:8001/v1.
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from streaming import format_marker
+from tokens import count_message_tokens, count_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_RE = re.compile(r'\bJOB (\d+) DETAILS:')
+LETTER_SENTENCE = ("I am excited to apply for this role, where my experience delivering "
+                   "results for cross-functional teams maps directly onto your needs.")
+
+
+class LatencyModel:
+    """Seconds a response waits before its first byte
+
+    kind is 'fixed' (mean), 'uniform' (mean +/- spread), 'normal' (mean, spread
+    as standard deviation) or 'lognormal' (median mean, spread as sigma of the
+    underlying normal, giving the long tail real endpoints show). per_job adds
+    time per letter requested, as generation time grows with output length.
+    """
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, kind: str = 'fixed', mean: float = 0.0, spread: float = 0.0,
+                 per_job: float = 0.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution {kind!r}, expected one of {self.KINDS}")
+        self.kind = kind
+        self.mean = mean
+        self.spread = spread
+        self.per_job = per_job
+
+    @classmethod
+    def parse(cls, spec: str, per_job: float = 0.0) -> 'LatencyModel':
+        """Build from 'kind:mean[:spread]', e.g. 'lognormal:1.5:0.5', or a bare mean"""
+        parts = spec.split(':')
+        if len(parts) == 1:
+            return cls('fixed', float(parts[0]), per_job=per_job)
+        return cls(parts[0], float(parts[1]), float(parts[2]) if len(parts) > 2 else 0.0, per_job)
+
+    def sample(self, rng: random.Random, jobs: int = 1) -> float:
+        if self.kind == 'uniform':
+            delay = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == 'normal':
+            delay = rng.gauss(self.mean, self.spread)
+        elif self.kind == 'lognormal':
+            delay = self.mean * rng.lognormvariate(0.0, self.spread) if self.mean > 0 else 0.0
+        else:
+            delay = self.mean
+        return max(0.0, delay + self.per_job * jobs)
+
+
+class StubCompletionServer:
+    """Threaded HTTP server answering chat completions like the OpenAI API
+
+    Each request is answered with '### COVER LETTER FOR JOB n ###' sections
+    for the job numbers found in its last message, sized by letter_words.
+    A rate_429 fraction of requests is refused with Retry-After, and a
+    rate_5xx fraction fails with a server error. Streaming requests get SSE
+    chunks, with a final usage chunk when stream_options asks for one; a
+    cut_stream_rate fraction of streams is closed partway through without
+    a finish_reason or [DONE].
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: Optional[LatencyModel] = None, rate_429: float = 0.0,
+                 rate_5xx: float = 0.0, retry_after: Optional[int] = 1,
+                 letter_words: int = 250, chunk_words: int = 8, chunk_delay: float = 0.0,
+                 include_usage: bool = True, drop_letter_rate: float = 0.0,
+                 cut_stream_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency or LatencyModel()
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.retry_after = retry_after
+        self.letter_words = letter_words
+        self.chunk_words = chunk_words
+        self.chunk_delay = chunk_delay
+        self.include_usage = include_usage
+        # Fraction of letters left out of a response, to exercise the repair pass
+        self.drop_letter_rate = drop_letter_rate
+        # Fraction of streams closed early, as a dropped connection would leave them
+        self.cut_stream_rate = cut_stream_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+        stub = self
+
+        class Handler(StubCompletionHandler):
+            server_state = stub
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_port
+
+    @property
+    def api_base(self) -> str:
+        host = self.httpd.server_address[0]
+        return f"http://{host}:{self.port}/v1"
+
+    def start(self) -> 'StubCompletionServer':
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def draw(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def delay(self, jobs: int) -> float:
+        with self._lock:
+            return self.latency.sample(self._rng, jobs)
+
+    def fault(self) -> Optional[int]:
+        """Status code to fail this request with, or None to answer it"""
+        roll = self.draw()
+        if roll < self.rate_429:
+            return 429
+        if roll < self.rate_429 + self.rate_5xx:
+            return 503 if roll < self.rate_429 + self.rate_5xx / 2 else 500
+        return None
+
+    def letters(self, numbers: List[int]) -> str:
+        """Marked letters of about letter_words words for the given job numbers"""
+        filler = LETTER_SENTENCE.split()
+        sections = []
+        for number in numbers:
+            if self.drop_letter_rate and self.draw() < self.drop_letter_rate:
+                continue
+            words = [filler[i % len(filler)] for i in range(max(self.letter_words - 4, 1))]
+            body = f"Dear Hiring Manager,\n\n{' '.join(words)}\n\nSincerely, Applicant {number}"
+            sections.append(f"{format_marker(number)}\n{body}")
+        return '\n\n'.join(sections)
+
+
+class StubCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep connections alive between requests
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+    server_state: StubCompletionServer = None
+
+    def do_POST(self):
+        stub = self.server_state
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_json(404, {'error': {'message': f"Unknown path {self.path}", 'type': 'invalid_request_error'}})
+            return
+        try:
+            payload = json.loads(body)
+            messages = payload['messages']
+        except (ValueError, KeyError, TypeError) as e:
+            stub.count('status_400')
+            self.send_json(400, {'error': {'message': f"Invalid request: {str(e)}", 'type': 'invalid_request_error'}})
+            return
+
+        prompt = messages[-1].get('content', '') if messages else ''
+        numbers = [int(number) for number in JOB_RE.findall(prompt)] or [1]
+        stub.count('requests')
+        stub.count('jobs', len(numbers))
+
+        status = stub.fault()
+        if status is not None:
+            stub.count(f'status_{status}')
+            self.send_error_status(status)
+            return
+
+        time.sleep(stub.delay(len(numbers)))
+        model = payload.get('model', 'gpt-4')
+        content = stub.letters(numbers)
+        prompt_tokens = count_message_tokens(messages, model)
+        completion_tokens = count_tokens(content, model)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+        stub.count('status_200')
+        stub.count('prompt_tokens', prompt_tokens)
+        stub.count('completion_tokens', completion_tokens)
+
+        if payload.get('stream'):
+            wants_usage = (payload.get('stream_options') or {}).get('include_usage', False)
+            self.send_stream(model, content, usage if wants_usage and stub.include_usage else None)
+            return
+
+        response = {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }]
+        }
+        if stub.include_usage:
+            response['usage'] = usage
+        self.send_json(200, response)
+
+    def send_json(self, status: int, data: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        try:
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.client_gone()
+
+    def send_error_status(self, status: int):
+        stub = self.server_state
+        headers = {}
+        if status == 429:
+            message, kind = 'Rate limit reached for requests', 'requests'
+            if stub.retry_after is not None:
+                headers['Retry-After'] = str(stub.retry_after)
+        else:
+            message, kind = 'The server had an error while processing your request', 'server_error'
+        self.send_json(status, {'error': {'message': message, 'type': kind}}, headers)
+
+    def send_stream(self, model: str, content: str, usage: Optional[Dict]):
+        """Send content as SSE chunks of chunk_words words, then [DONE]"""
+        stub = self.server_state
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        try:
+            self.end_headers()
+        except (BrokenPipeError, ConnectionResetError):
+            self.client_gone()
+            return
+
+        def event(choices: List[Dict], extra: Optional[Dict] = None) -> bool:
+            data = {'id': completion_id, 'object': 'chat.completion.chunk',
+                    'created': int(time.time()), 'model': model, 'choices': choices}
+            data.update(extra or {})
+            return self.write_chunk(f"data: {json.dumps(data)}\n\n")
+
+        # Stop at the first write that finds the client gone
+        if not event([{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}]):
+            return
+        pieces = re.findall(r'\S+\s*', content)
+        cut = bool(stub.cut_stream_rate) and stub.draw() < stub.cut_stream_rate
+        if cut:
+            pieces = pieces[:len(pieces) * 3 // 4]
+        for start in range(0, len(pieces), max(stub.chunk_words, 1)):
+            if stub.chunk_delay:
+                time.sleep(stub.chunk_delay)
+            text = ''.join(pieces[start:start + stub.chunk_words])
+            if not event([{'index': 0, 'delta': {'content': text}, 'finish_reason': None}]):
+                return
+        if cut:
+            # End the chunked body cleanly, so only the missing [DONE] gives it away
+            stub.count('cut_streams')
+            self.write_chunk('')
+            self.close_connection = True
+            return
+        if not event([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]):
+            return
+        if usage is not None and not event([], {'usage': usage}):
+            return
+        if self.write_chunk("data: [DONE]\n\n"):
+            self.write_chunk('')
+
+    def write_chunk(self, text: str) -> bool:
+        """Write one chunk of a chunked response, returning False if the client has gone"""
+        data = text.encode('utf-8')
+        try:
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            self.client_gone()
+            return False
+
+    def client_gone(self):
+        """Count a client that hung up mid-response and drop its connection"""
+        self.server_state.count('disconnects')
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the OpenAI chat completions API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', default='0',
+                        help="Seconds before responding: a mean, or kind:mean[:spread] with kind "
+                             "fixed, uniform, normal or lognormal")
+    parser.add_argument('--latency-per-job', type=float, default=0.0,
+                        help='Extra seconds per letter requested')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests rate limited')
+    parser.add_argument('--rate-5xx', type=float, default=0.0, help='Fraction of requests failing with 500/503')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Retry-After seconds sent with 429s (negative to omit the header)')
+    parser.add_argument('--letter-words', type=int, default=250, help='Words per generated letter')
+    parser.add_argument('--chunk-words', type=int, default=8, help='Words per streamed chunk')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='Seconds between streamed chunks')
+    parser.add_argument('--drop-letter-rate', type=float, default=0.0,
+                        help='Fraction of letters left out of responses')
+    parser.add_argument('--cut-stream-rate', type=float, default=0.0,
+                        help='Fraction of streams closed partway through, without [DONE]')
+    parser.add_argument('--no-usage', action='store_true', help='Leave usage fields out of responses')
+    parser.add_argument('--seed', type=int, help='Seed for latency and fault draws')
+    args = parser.parse_args()
+
+    server = StubCompletionServer(
+        host=args.host, port=args.port,
+        latency=LatencyModel.parse(args.latency, per_job=args.latency_per_job),
+        rate_429=args.rate_429, rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        letter_words=args.letter_words, chunk_words=args.chunk_words, chunk_delay=args.chunk_delay,
+        include_usage=not args.no_usage, drop_letter_rate=args.drop_letter_rate,
+        cut_stream_rate=args.cut_stream_rate, seed=args.seed
+    )
+    logger.info(f"Serving chat completions at {server.api_base} (set OPENAI_BASE_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Stub server stats: {json.dumps(server.stats)}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -50,7 +50,8 @@ class LinkedInCoverLetterTester:
         
         return len(links_to_process)
 
-    def run_linkedin_test(self, num_links=5, batch_size=None):
+    def run_linkedin_test(self, num_links=5, batch_size=None, num_browsers=1, refresh=False,
+                          resume=False, stream=False, profile=False):
         """
         Run cover letter generation test for LinkedIn links
         
@@ -58,6 +59,11 @@ class LinkedInCoverLetterTester:
             num_links (int): Number of links to process
             batch_size (int, optional): Batch size for processing. 
                                         If None, use num_links
+            num_browsers (int): Number of browsers scraping in parallel
+            refresh (bool): Re-scrape pages even if they are cached
+            resume (bool): Skip jobs already completed by an interrupted run
+            stream (bool): Stream completions and record letters as they finish
+            profile (bool): Profile the run with cProfile alongside the stage trace
         """
         try:
             # Load environment variables
@@ -87,7 +93,10 @@ class LinkedInCoverLetterTester:
             # Initialize generator
             generator = CoverLetterGenerator(
                 resume_text=resume_text,
-                openai_api_key=openai_api_key
+                openai_api_key=openai_api_key,
+                num_browsers=num_browsers,
+                force_refresh=refresh,
+                stream=stream
             )
             
             # Process jobs
@@ -95,7 +104,9 @@ class LinkedInCoverLetterTester:
             generator.process_job_links(
                 excel_path='linkedin_test_jobs.xlsx',
                 output_path=output_file,
-                batch_size=batch_size
+                batch_size=batch_size,
+                resume=resume,
+                profile_path=f'linkedin_output_{num_links}_links.prof' if profile else None
             )
             
             # Analyze results
@@ -141,11 +152,23 @@ def main():
                         help='Number of LinkedIn links to process. Use -1 for all links.')
     parser.add_argument('-b', '--batch_size', type=int, default=None, 
                         help='Batch size for processing. Defaults to num_links if not specified.')
+    parser.add_argument('-w', '--num_browsers', type=int, default=1,
+                        help='Number of browsers scraping in parallel.')
+    parser.add_argument('-r', '--refresh', action='store_true',
+                        help='Re-scrape job pages instead of using the page cache.')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run, skipping jobs already in its journal.')
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help='Stream completions so each letter is recorded as soon as it finishes.')
+    parser.add_argument('-p', '--profile', action='store_true',
+                        help='Profile the run with cProfile in addition to the stage trace.')
     
     args = parser.parse_args()
     
     tester = LinkedInCoverLetterTester()
-    tester.run_linkedin_test(num_links=args.num_links, batch_size=args.batch_size)
+    tester.run_linkedin_test(num_links=args.num_links, batch_size=args.batch_size,
+                             num_browsers=args.num_browsers, refresh=args.refresh,
+                             resume=args.resume, stream=args.stream, profile=args.profile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
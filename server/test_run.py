@@ -5,7 +5,6 @@ import logging
 from app import CoverLetterGenerator
 import pandas as pd
 from links import JobLinks
-import time
 import traceback
 
 logging.basicConfig(
@@ -109,37 +108,27 @@ def run_batch_test(start_index=0, batch_size=5, num_batches=3):
         if 'generator' in locals():
             del generator
 
-def process_all_links_in_batches(batch_size=5, delay_between_batches=300):  # 5 minute delay
-    """Process all links in multiple batches with delays"""
+def process_all_links_in_batches(batch_size=5):
+    """Process all links in one run, generating in batches of batch_size
+
+    Scraping is paced per job board by the generator's politeness scheduler,
+    so there is no need to pause between batches.
+    """
     job_links = JobLinks()
     total_links = len(job_links.cleaned_links)
     num_batches = (total_links + batch_size - 1) // batch_size  # Round up division
     
     logger.info(f"Starting processing of {total_links} links in {num_batches} batches")
-    
-    for batch_num in range(num_batches):
-        start_index = batch_num * batch_size
-        logger.info(f"\nProcessing Batch {batch_num + 1} of {num_batches}")
-        
-        # Process current batch
-        run_batch_test(
-            start_index=start_index,
-            batch_size=batch_size,
-            num_batches=1
-        )
-        
-        # Delay between batches (except for the last batch)
-        if batch_num < num_batches - 1:
-            logger.info(f"Waiting {delay_between_batches} seconds before next batch...")
-            time.sleep(delay_between_batches)
+    run_batch_test(
+        start_index=0,
+        batch_size=batch_size,
+        num_batches=num_batches
+    )
 
 if __name__ == "__main__":
     try:
-        # Process all links in batches of 5 with delays
-        process_all_links_in_batches(
-            batch_size=5,
-            delay_between_batches=300  # 5 minutes between batches
-        )
+        # Process all links, generating in batches of 5
+        process_all_links_in_batches(batch_size=5)
     except KeyboardInterrupt:
         logger.info("Processing interrupted by user")
     except Exception as e:
@@ -1,13 +1,14 @@
 # test_scraping.py
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
+from selenium.common.exceptions import WebDriverException
 import logging
 import pandas as pd
 from links import JobLinks
+from browser_pool import BrowserPool
+from readiness import PageReadiness
+from page_weight import PageWeight
+from politeness import PolitenessScheduler
+from extraction import ContentExtractor
 
 # Configure logging
 logging.basicConfig(
@@ -17,139 +18,92 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class JobScraper:
-    def __init__(self):
-        # Set up Chrome options
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--start-maximized')
-        chrome_options.add_argument('--disable-notifications')
-        # chrome_options.add_argument('--headless')  # Uncomment for headless mode
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
+    def __init__(self, num_browsers=1, driver_factory=None, browser_profile='lean'):
+        # Pool of headless browsers, started lazily on first checkout
+        self.browser_pool = BrowserPool(size=num_browsers, driver_factory=driver_factory,
+                                        profile=browser_profile)
+        self.readiness = PageReadiness()
+        self.page_weight = PageWeight()
+        # Paces page loads per job board
+        self.politeness = PolitenessScheduler()
+        # Keep every meaningful paragraph rather than only the longest ones
+        self.extractor = ContentExtractor(max_chars=2000, fallback_chars=1000,
+                                          min_paragraph_words=5, top_paragraphs=None)
 
     def extract_page_content(self, html_content, url):
         """
         Extract precise job description content with platform-specific strategies
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove unwanted elements
-        for unwanted in soup.find_all(['script', 'style', 'nav', 'footer', 'header']):
-            unwanted.decompose()
+        return self.extractor.extract(html_content, url)
 
-        # Platform-specific selectors
-        platform_selectors = {
-            'linkedin.com': [
-                '.jobs-description-content__text',
-                '.description__text',
-                '.jobs-box__html-content',
-                '[data-job-description-content]'
-            ],
-            'greenhouse.io': [
-                '.greenhouse-job-description',
-                '.job-description',
-                '#job_description',
-                '.field-group-format-wrapper'
-            ],
-            'climatebase.org': [
-                '.job-details',
-                '.job-description',
-                '[data-testid="job-description"]'
-            ],
-            'ashbyhq.com': [
-                '.job-description-section',
-                '.job-description',
-                '[data-testid="job-description"]'
-            ]
-        }
+    def scrape_job_content(self, url, max_attempts=2):
+        """Enhanced job content scraping with platform-specific handling"""
+        for attempt in range(1, max_attempts + 1):
+            try:
+                with self.politeness.slot(url), self.browser_pool.checkout() as driver:
+                    text_content = self._scrape_with_driver(driver, url)
+                logger.info(f"Successfully scraped content from: {url}")
+                return text_content.strip()
 
-        # Determine platform
-        platform = next((p for p in platform_selectors if p in url), 'generic')
-        
-        # Selectors to try
-        selectors_to_try = platform_selectors.get(platform, []) + [
-            '#job-description',
-            '.job-description',
-            '[data-testid="job-description"]',
-            'main',
-            'article',
-            'div[class*="content"]',
-            'div[class*="description"]'
-        ]
+            except WebDriverException as e:
+                # The pool replaces a dead browser, so a retry gets a fresh one
+                if attempt < max_attempts:
+                    logger.warning(f"Browser error scraping {url}, retrying: {str(e)}")
+                    continue
+                logger.error(f"Error scraping {url}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error scraping {url}: {str(e)}")
+                break
 
-        # Try specific selectors
-        for selector in selectors_to_try:
-            description_elements = soup.select(selector)
-            
-            if description_elements:
-                # Combine text from all matching elements
-                paragraphs = []
-                for element in description_elements:
-                    # Find meaningful paragraphs
-                    paras = element.find_all(['p', 'li'])
-                    paragraphs.extend([
-                        p.get_text(strip=True) 
-                        for p in paras 
-                        if len(p.get_text(strip=True).split()) > 5
-                    ])
-                
-                # Combine and clean text
-                if paragraphs:
-                    content = ' '.join(paragraphs)
-                    logger.info(f"Content extracted using selector: {selector}")
-                    return content[:2000]  # Limit length
-        
-        # Fallback: extract all text
-        return ' '.join(soup.get_text(strip=True).split())[:1000]
+        return "Error scraping job content"
 
-    def scrape_job_content(self, url):
-        """Enhanced job content scraping with platform-specific handling"""
-        try:
-            self.driver.get(url)
-            time.sleep(3)  # Allow page to load
-            
-            # Platform-specific preprocessing
-            if 'linkedin.com' in url:
-                # Scroll to expand full description
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-                time.sleep(1)
-            elif 'greenhouse.io' in url:
-                # Click "Show more" if exists
-                try:
-                    show_more = self.driver.find_elements(By.XPATH, "//a[contains(text(), 'Show more')]")
-                    if show_more:
-                        show_more[0].click()
-                        time.sleep(1)
-                except:
-                    pass
-            
-            # Get the page source after JavaScript rendering
-            page_source = self.driver.page_source
-            
-            # Extract text content
-            text_content = self.extract_page_content(page_source, url)
-            
-            logger.info(f"Successfully scraped content from: {url}")
-            return text_content.strip()
+    def _scrape_with_driver(self, driver, url):
+        """Load a URL in the given browser and extract its job content"""
+        driver.get(url)
+        self.readiness.wait(driver, url)  # Wait for the description to render
+        
+        # Platform-specific preprocessing
+        if 'linkedin.com' in url:
+            # Scroll to expand full description
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+            self.readiness.settle(driver)
+        elif 'greenhouse.io' in url:
+            # Click "Show more" if exists
+            try:
+                show_more = driver.find_elements(By.XPATH, "//a[contains(text(), 'Show more')]")
+                if show_more:
+                    show_more[0].click()
+                    self.readiness.settle(driver)
+            except:
+                pass
+        
+        self.page_weight.measure(driver, url)
 
-        except Exception as e:
-            logger.error(f"Error scraping {url}: {str(e)}")
-            return "Error scraping job content"
+        # Get the page source after JavaScript rendering
+        page_source = driver.page_source
+        
+        # Extract text content
+        return self.extract_page_content(page_source, url)
 
     def batch_scrape_jobs(self, urls, output_path='job_scraping_results.xlsx'):
         """Batch scrape multiple job links"""
-        results = []
-        
-        for url in urls:
+        def scrape_one(url):
             try:
                 content = self.scrape_job_content(url)
-                results.append({
+                return {
                     'job_link': url,
                     'job_content': content,
                     'content_length': len(content)
-                })
+                }
             except Exception as e:
                 logger.error(f"Error processing {url}: {str(e)}")
+                return None
+        
+        # Scrape across the browser pool alternating between hosts, then restore input order
+        urls = list(urls)
+        order = self.politeness.interleave(urls)
+        scraped = dict(zip(order, self.browser_pool.map(scrape_one, [urls[i] for i in order])))
+        results = [scraped[i] for i in range(len(urls)) if scraped[i] is not None]
         
         # Save results to Excel
         results_df = pd.DataFrame(results)
@@ -162,21 +116,24 @@ class JobScraper:
         logger.info(f"Average content length: {results_df['content_length'].mean():.2f}")
         logger.info(f"Min content length: {results_df['content_length'].min()}")
         logger.info(f"Max content length: {results_df['content_length'].max()}")
+        self.readiness.log_summary()
+        self.page_weight.log_summary()
+        self.politeness.log_summary()
 
     def __del__(self):
-        """Clean up browser instance"""
+        """Clean up browser instances"""
         try:
-            self.driver.quit()
+            self.browser_pool.close()
         except:
             pass
 
-def run_scraping_test():
+def run_scraping_test(num_browsers=4):
     """Run comprehensive scraping test"""
     # Initialize job links
     job_links = JobLinks()
     
     # Create scraper
-    scraper = JobScraper()
+    scraper = JobScraper(num_browsers=num_browsers)
     
     # Batch scrape jobs
     scraper.batch_scrape_jobs(job_links.cleaned_links)
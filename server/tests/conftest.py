@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# The server modules are flat top-level modules, imported the way the scripts import them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
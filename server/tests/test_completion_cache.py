@@ -0,0 +1,36 @@
+# test_completion_cache.py
+import pytest
+
+from app import CoverLetterGenerator, is_failed_letter
+from stub_openai import StubCompletionServer
+
+RESUME = "Jane Doe\nSenior Python engineer. Led a migration that cut API latency by 40%."
+JOBS = ["Backend engineer working on Python services", "Data engineer building ETL pipelines"]
+
+
+def make_generator(server, tmp_path, **kwargs):
+    return CoverLetterGenerator(
+        RESUME, 'test', api_base=server.api_base, cache_dir=None,
+        completion_cache_path=str(tmp_path / 'completions.sqlite'),
+        profile_dir=str(tmp_path / 'profiles'), relevant_achievements=None,
+        parse_workers=0, **kwargs
+    )
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_malformed_response_is_not_served_on_rerun(tmp_path, stream):
+    with StubCompletionServer(drop_letter_rate=1.0) as server:
+        generator = make_generator(server, tmp_path, stream=stream, repair_attempts=0)
+        letters = generator.generate_multiple_cover_letters(JOBS)
+        assert all(is_failed_letter(letter) for letter in letters)
+
+        server.drop_letter_rate = 0.0
+        letters = generator.generate_multiple_cover_letters(JOBS)
+        assert not any(is_failed_letter(letter) for letter in letters)
+        assert server.stats['requests'] == 2
+
+        # Only the fully parsed response is served from the cache
+        letters = generator.generate_multiple_cover_letters(JOBS)
+        assert not any(is_failed_letter(letter) for letter in letters)
+        assert server.stats['requests'] == 2
+
@@ -0,0 +1,29 @@
+# test_condense.py
+from condense import JobDescriptionCondenser
+from extraction import ContentExtractor
+from tokens import count_tokens
+
+# A posting scraped without any sentence breaks, far over the token budget
+WORDS = "we need a senior python engineer with experience building data pipelines and apis".split()
+UNPUNCTUATED = ' '.join(WORDS[i % len(WORDS)] for i in range(2000))
+
+
+def test_long_unpunctuated_posting_keeps_a_truncated_prefix():
+    condenser = JobDescriptionCondenser(max_tokens=450)
+    condensed = condenser.condense_text(UNPUNCTUATED)
+    assert condensed
+    assert UNPUNCTUATED.startswith(condensed)
+    assert count_tokens(condensed) <= 450
+
+
+def test_long_unpunctuated_page_is_extracted():
+    extractor = ContentExtractor(condenser=JobDescriptionCondenser(max_tokens=450))
+    html = f"<html><body><div class='description'><p>{UNPUNCTUATED}</p></div></body></html>"
+    text = extractor.extract(html, 'https://example.com/jobs/1')
+    assert text.startswith("we need a senior python engineer")
+
+
+def test_sentences_that_fit_are_kept_whole():
+    condenser = JobDescriptionCondenser(max_tokens=450)
+    posting = "You will build data pipelines in Python. You must have five years of experience with SQL."
+    assert condenser.condense_text(posting) == posting
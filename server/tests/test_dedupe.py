@@ -0,0 +1,27 @@
+# test_dedupe.py
+from dedupe import NearDuplicateIndex
+
+DESCRIPTION = " ".join(
+    f"Responsibility {number}: design, build and operate reliable {area} services with the {team} team."
+    for number, (area, team) in enumerate(
+        (area, team) for area in ["data", "search", "billing", "identity", "storage", "messaging"]
+        for team in ["platform", "product", "analytics", "security", "infrastructure"]
+    )
+)
+
+
+def posting(location: str, job_id: int = 1) -> str:
+    return f"Senior Data Engineer, {location}. Job {job_id}. {DESCRIPTION}"
+
+
+def test_reposted_role_is_collapsed():
+    index = NearDuplicateIndex()
+    assert index.add(0, posting("Berlin", job_id=101)) is None
+    assert index.add(1, posting("Berlin", job_id=202)) == 0
+
+
+def test_same_role_in_another_location_is_kept():
+    index = NearDuplicateIndex()
+    assert index.add(0, posting("Berlin")) is None
+    assert index.add(1, posting("Lisbon")) is None
+    assert index.duplicates == 0
@@ -0,0 +1,26 @@
+# test_http_client.py
+import pytest
+import requests
+
+from http_client import OpenAIClient
+from stub_openai import LatencyModel, StubCompletionServer
+
+PAYLOAD = {'model': 'gpt-4', 'messages': [{'role': 'user', 'content': 'JOB 1 DETAILS: Python engineer'}]}
+
+
+def test_read_timeout_does_not_resend_completion():
+    with StubCompletionServer(latency=LatencyModel('fixed', 1.0)) as server:
+        client = OpenAIClient('test', api_base=server.api_base, read_timeout=0.3, backoff_factor=0)
+        with pytest.raises(requests.RequestException):
+            client.chat_completion(PAYLOAD)
+        client.close()
+        assert server.stats['requests'] == 1
+
+
+def test_rate_limited_completion_is_retried():
+    with StubCompletionServer(rate_429=1.0, retry_after=0) as server:
+        client = OpenAIClient('test', api_base=server.api_base, max_retries=2, backoff_factor=0)
+        with pytest.raises(requests.HTTPError):
+            client.chat_completion(PAYLOAD)
+        client.close()
+        assert server.stats['requests'] == 3
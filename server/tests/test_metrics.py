@@ -0,0 +1,43 @@
+# test_metrics.py
+from metrics import RunMetrics, request_cost
+
+JOBS = ["Backend engineer working on Python services", "Data engineer building ETL pipelines"]
+
+
+def test_failed_request_with_usage_is_costed():
+    metrics = RunMetrics()
+    usage = {'prompt_tokens': 1000, 'completion_tokens': 500}
+    metrics.record_request('gpt-4', JOBS, ["Dear Hiring Manager", "Error: Stream interrupted"],
+                           1000, 2.0, usage=usage, streamed=True, error="Stream interrupted: reset")
+    assert metrics.batches[0]['cost_usd'] == round(request_cost('gpt-4', 1000, 500), 6)
+    assert sum(job['cost_usd'] for job in metrics.jobs) > 0
+
+
+def test_cached_request_is_free():
+    metrics = RunMetrics()
+    metrics.record_request('gpt-4', JOBS, ["Dear Hiring Manager", "Dear Hiring Team"], 1000, 0.01,
+                           usage={'prompt_tokens': 1000, 'completion_tokens': 500}, cached=True)
+    assert metrics.batches[0]['cost_usd'] == 0.0
+    assert all(job['cost_usd'] == 0.0 for job in metrics.jobs)
+
+
+def test_rejected_request_is_not_costed():
+    metrics = RunMetrics()
+    letters = ["Error: Unexpected error in generation"] * 2
+    metrics.record_request('gpt-4', JOBS, letters, 1000, 0.5, error="429 Client Error: Too Many Requests")
+    assert metrics.batches[0]['cost_usd'] == 0.0
+    assert all(job['cost_usd'] == 0.0 for job in metrics.jobs)
+
+
+def test_timed_out_request_is_costed_from_estimates():
+    metrics = RunMetrics()
+    letters = ["Error: Unexpected error in generation"] * 2
+    metrics.record_request('gpt-4', JOBS, letters, 1000, 45.0, error="Read timed out", generation_started=True)
+    assert metrics.batches[0]['cost_usd'] == round(request_cost('gpt-4', 1000, 0), 6)
+
+
+def test_jobs_with_identical_content_keep_their_own_labels():
+    metrics = RunMetrics()
+    urls = ['https://example.com/jobs/1', 'https://example.com/jobs/2']
+    metrics.record_request('gpt-4', [JOBS[0], JOBS[0]], ["Dear Hiring Manager"] * 2, 1000, 1.0, labels=urls)
+    assert [job['job'] for job in metrics.jobs] == urls
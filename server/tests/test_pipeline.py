@@ -0,0 +1,52 @@
+# test_pipeline.py
+from batching import TokenBudgetBatcher
+from generation_engine import AsyncGenerationEngine
+from pipeline import ScrapeGeneratePipeline
+from politeness import PolitenessScheduler
+
+URLS = [f"https://example.com/jobs/{i}" for i in range(5)]
+
+
+class FakeGenerator:
+    """Scrapes a fixed posting per URL and writes one letter per job"""
+
+    def __init__(self):
+        self.politeness = PolitenessScheduler(enabled=False)
+
+    def scrape_threads(self):
+        return 2
+
+    def scrape_job_content(self, url):
+        return f"Python engineer role posted at {url}"
+
+    def generate_multiple_cover_letters(self, job_contents_list, on_letter=None, labels=None):
+        return [f"Dear Hiring Manager, letter {i}" for i in range(len(job_contents_list))]
+
+
+class RecordingSink:
+    def __init__(self):
+        self.written = []
+
+    def write(self, results):
+        self.written.extend(results)
+
+
+def test_failed_batch_still_gets_a_result_per_job(monkeypatch):
+    async def fail(self, batch, label='', on_letter=None, job_labels=None):
+        raise RuntimeError("generation thread pool is gone")
+
+    monkeypatch.setattr(AsyncGenerationEngine, 'generate', fail)
+    sink = RecordingSink()
+    pipeline = ScrapeGeneratePipeline(FakeGenerator(), TokenBudgetBatcher(max_jobs_per_batch=2),
+                                      max_in_flight=1, sinks=[sink])
+    results = pipeline.run(URLS)
+    assert [result['job_link'] for result in results] == URLS
+    assert all(result['cover_letter'] == "Error generating cover letter" for result in results)
+    assert len(sink.written) == len(URLS)
+
+
+def test_pipeline_returns_letters_in_input_order():
+    pipeline = ScrapeGeneratePipeline(FakeGenerator(), TokenBudgetBatcher(max_jobs_per_batch=2), max_in_flight=2)
+    results = pipeline.run(URLS)
+    assert [result['job_link'] for result in results] == URLS
+    assert all(result['cover_letter'].startswith("Dear Hiring Manager") for result in results)
@@ -0,0 +1,69 @@
+# test_relevance.py
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app import CoverLetterGenerator
+from relevance import RelevanceScorer, tokenize
+from tokens import count_tokens
+
+PROFILE = {
+    'professional_summary': 'Python engineer building data pipelines',
+    'skill_matrix': ['Python', 'SQL', 'Airflow'],
+    'key_achievements': ['Built ETL pipelines in Python and SQL', 'Scheduled Airflow jobs'],
+}
+
+
+def test_unicode_punctuation_separates_terms():
+    assert tokenize("Python—SQL “pipelines” café c++") == ['python', 'sql', 'pipelines', 'café', 'c++']
+    scorer = RelevanceScorer(PROFILE)
+    plain, punctuated = scorer.scores(["python sql pipelines", "python—sql “pipelines”"])
+    assert punctuated == plain
+
+
+def test_scores_are_independent_across_threads():
+    scorer = RelevanceScorer(PROFILE)
+    # Posting sets with different document frequencies, and so different IDF vectors
+    sets = [["python sql", "airflow"] * (i + 1) + ["pipelines"] * i for i in range(6)]
+    expected = [scorer.scores(jobs) for jobs in sets]
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(scorer.scores, sets * 50))
+    for index, scores in enumerate(results):
+        np.testing.assert_array_equal(scores, expected[index % len(sets)])
+
+
+def test_long_terms_sharing_their_ends_do_not_collide():
+    # Same length, first eight and last eight bytes; only the middle differs
+    scorer = RelevanceScorer({'skill_matrix': ['kubernetesoperatorframework']})
+    matching, colliding = scorer.scores(["kubernetesoperatorframework", "kubernetXXXXXXXXXXXramework"],
+                                        corpus_idf=False)
+    assert matching > 0
+    assert colliding == 0
+
+
+def test_evidence_does_not_depend_on_batch_mates():
+    scorer = RelevanceScorer(PROFILE)
+    job = "Senior engineer to schedule Airflow jobs and build SQL pipelines"
+    alone = scorer.select([job])[0]
+    batched = scorer.select([job, "Python python python data pipelines", "Airflow operator"])[0]
+    assert batched == alone
+
+
+
+def test_evidence_tokens_bounds_every_job(tmp_path):
+    # The longest skills come last, and one achievement grows once JSON escapes it
+    profile = {
+        'skill_matrix': ['Go', 'R', 'Kubernetes operators for distributed systems', 'Stream processing at scale'],
+        'key_achievements': ['Cut costs 40%', 'Scaled “search” — to — millions — of — users', 'Led team'],
+    }
+    generator = CoverLetterGenerator("Python engineer", 'test', cache_dir=None, completion_cache_path=None,
+                                     profile_dir=str(tmp_path / 'profiles'), parse_workers=0,
+                                     relevant_achievements=1, relevant_skills=2)
+    generator._relevance_scorer = RelevanceScorer(profile)
+    bound = generator.evidence_tokens()
+    jobs = ["Kubernetes operators for distributed systems and stream processing at scale",
+            "Scaled search to millions of users"]
+    for selection in generator.relevance_scorer().select(jobs, top_achievements=1, top_skills=2):
+        evidence = {key: selection[key] for key in ('key_achievements', 'skill_matrix')}
+        assert count_tokens(f" MOST RELEVANT CANDIDATE EVIDENCE: {json.dumps(evidence)}") <= bound
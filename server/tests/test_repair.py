@@ -0,0 +1,29 @@
+# test_repair.py
+from app import CoverLetterGenerator, is_failed_letter
+from stub_openai import StubCompletionServer
+
+RESUME = "Jane Doe\nSenior Python engineer. Led a migration that cut API latency by 40%."
+JOBS = ["Backend engineer working on Python services", "Data engineer building ETL pipelines"]
+
+
+class LastLetterDroppingServer(StubCompletionServer):
+    """Drops the last letter of the first response and every letter after it"""
+
+    def letters(self, numbers):
+        if self.stats['requests'] > 1:
+            return ''
+        return super().letters(numbers[:-1])
+
+
+def test_repair_failure_keeps_original_job_number(tmp_path):
+    with LastLetterDroppingServer() as server:
+        generator = CoverLetterGenerator(
+            RESUME, 'test', api_base=server.api_base, cache_dir=None,
+            completion_cache_path=str(tmp_path / 'completions.sqlite'),
+            profile_dir=str(tmp_path / 'profiles'), relevant_achievements=None,
+            parse_workers=0, repair_attempts=2
+        )
+        letters = generator.generate_multiple_cover_letters(JOBS)
+        assert not is_failed_letter(letters[0])
+        assert letters[1] == "Error: Could not find cover letter for job 2"
+        assert server.stats['requests'] == 3
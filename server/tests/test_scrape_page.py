@@ -0,0 +1,45 @@
+# test_scrape_page.py
+from app import CoverLetterGenerator
+
+
+class FakeDriver:
+    """Browser stand-in whose pages are ready at once and render the given HTML"""
+
+    current_url = 'about:blank'
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+        self.visits = []
+
+    def get(self, url):
+        self.visits.append(url)
+
+    def find_elements(self, *args):
+        return [object()]
+
+    def execute_script(self, *args):
+        return None
+
+    def quit(self):
+        pass
+
+
+def make_generator(tmp_path, driver):
+    return CoverLetterGenerator(
+        "Python engineer", 'test', driver_factory=lambda: driver, http_first=False,
+        cache_dir=None, completion_cache_path=None, profile_dir=str(tmp_path / 'profiles'),
+        parse_workers=0, politeness=False
+    )
+
+
+def test_empty_page_is_a_scrape_error(tmp_path):
+    driver = FakeDriver("<html><body>   </body></html>")
+    generator = make_generator(tmp_path, driver)
+    assert generator.scrape_job_content('https://example.com/job/1') == "Error scraping job content"
+    assert len(driver.visits) == 2
+
+
+def test_rendered_page_is_scraped(tmp_path):
+    driver = FakeDriver("<html><body><p>Senior Python engineer to build data pipelines.</p></body></html>")
+    generator = make_generator(tmp_path, driver)
+    assert "Python engineer" in generator.scrape_job_content('https://example.com/job/1')
@@ -0,0 +1,56 @@
+# test_streaming.py
+import json
+
+import pytest
+
+from app import CoverLetterGenerator, is_failed_letter
+from streaming import iter_sse_events
+from stub_openai import StubCompletionServer
+
+RESUME = "Jane Doe\nSenior Python engineer. Led a migration that cut API latency by 40%."
+JOBS = ["Backend engineer working on Python services", "Data engineer building ETL pipelines"]
+
+
+class FakeResponse:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+
+def chunk(content=None, finish_reason=None):
+    delta = {'content': content} if content is not None else {}
+    return 'data: ' + json.dumps({'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]})
+
+
+def test_stream_closed_before_done_raises():
+    events = iter_sse_events(FakeResponse([chunk('### COVER LETTER FOR JOB 1 ###\nDear')]))
+    assert next(events)['choices'][0]['delta']['content'].endswith('Dear')
+    with pytest.raises(ConnectionError):
+        next(events)
+
+
+def test_stream_with_finish_reason_but_no_done_is_complete():
+    events = list(iter_sse_events(FakeResponse([chunk('Dear'), chunk(finish_reason='stop')])))
+    assert len(events) == 2
+
+
+def test_cut_stream_is_repaired_and_not_cached(tmp_path):
+    with StubCompletionServer(cut_stream_rate=1.0, letter_words=40) as server:
+        generator = CoverLetterGenerator(
+            RESUME, 'test', api_base=server.api_base, cache_dir=None, stream=True,
+            completion_cache_path=str(tmp_path / 'completions.sqlite'),
+            profile_dir=str(tmp_path / 'profiles'), relevant_achievements=None,
+            parse_workers=0, repair_attempts=0
+        )
+        letters = generator.generate_multiple_cover_letters(JOBS)
+        assert not is_failed_letter(letters[0])
+        assert letters[1] == "Error: Stream interrupted before cover letter for job 2"
+
+        server.cut_stream_rate = 0.0
+        generator.repair_attempts = 1
+        letters = generator.generate_multiple_cover_letters(JOBS)
+        assert not any(is_failed_letter(letter) for letter in letters)
+        assert server.stats['requests'] == 2
+        assert server.stats['cut_streams'] == 1
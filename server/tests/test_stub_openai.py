@@ -0,0 +1,25 @@
+# test_stub_openai.py
+import json
+import socket
+import struct
+import time
+
+from stub_openai import StubCompletionServer
+
+
+def test_stream_stops_when_client_disconnects():
+    with StubCompletionServer(chunk_words=1, chunk_delay=0.01, letter_words=200) as server:
+        body = json.dumps({'model': 'gpt-4', 'stream': True,
+                           'messages': [{'role': 'user', 'content': 'JOB 1 DETAILS: Python engineer'}]})
+        client = socket.create_connection(('127.0.0.1', server.port))
+        client.sendall((f"POST /v1/chat/completions HTTP/1.1\r\nHost: localhost\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n{body}").encode())
+        assert client.recv(1024).startswith(b'HTTP/1.1 200')
+        # Reset rather than close politely, so the server's next write fails
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        client.close()
+
+        deadline = time.monotonic() + 5
+        while not server.stats.get('disconnects') and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert server.stats.get('disconnects') == 1
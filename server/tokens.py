@@ -0,0 +1,78 @@
+# tokens.py
+import logging
+import math
+from typing import Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Context window and maximum completion size per model, in tokens
+MODEL_LIMITS = {
+    'gpt-4': {'context': 8192, 'max_output': 4096},
+    'gpt-4-turbo': {'context': 128000, 'max_output': 4096},
+    'gpt-4o': {'context': 128000, 'max_output': 16384},
+    'gpt-4o-mini': {'context': 128000, 'max_output': 16384},
+    'gpt-3.5-turbo': {'context': 16385, 'max_output': 4096},
+}
+DEFAULT_LIMITS = MODEL_LIMITS['gpt-4']
+
+# Rough English average when no tokenizer is installed
+CHARS_PER_TOKEN = 4
+# Chat format overhead per message and per reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+_encodings = {}
+
+
+def model_limits(model: str) -> Dict[str, int]:
+    """Context and output limits for a model, matching on the longest known prefix"""
+    matches = [name for name in MODEL_LIMITS if model.startswith(name)]
+    if not matches:
+        return DEFAULT_LIMITS
+    return MODEL_LIMITS[max(matches, key=len)]
+
+
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except Exception:
+            _encodings[model] = tiktoken.get_encoding('cl100k_base')
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = 'gpt-4') -> int:
+    """Number of tokens in text, exact with tiktoken and estimated otherwise"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = 'gpt-4') -> int:
+    """Prompt tokens for a list of chat messages"""
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count_tokens(message.get('content', ''), model)
+    return total
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = 'gpt-4') -> str:
+    """Cut text down to at most max_tokens tokens"""
+    if max_tokens <= 0:
+        return ''
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
@@ -0,0 +1,155 @@
+# tracing.py
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from stats import percentile
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """Records timed spans per stage, for percentiles and a Chrome trace file
+
+    Spans nest per thread. In profile mode the outermost span on each thread
+    also runs under cProfile, and the profiles are merged when dumped.
+    """
+
+    def __init__(self, enabled: bool = True, profile: bool = False):
+        self.enabled = enabled
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._events: List[Dict] = []
+        self._profiles: List[cProfile.Profile] = []
+        self._origin = time.perf_counter()
+
+    def reset(self, profile: Optional[bool] = None):
+        """Drop recorded spans and profiles, optionally switching profile mode"""
+        with self._lock:
+            self._events = []
+            self._profiles = []
+            self._origin = time.perf_counter()
+            if profile is not None:
+                self.profile = profile
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Time the enclosed block as one occurrence of stage name"""
+        if not self.enabled:
+            yield
+            return
+        depth = getattr(self._local, 'depth', 0)
+        profiler = self._start_profile() if self.profile and depth == 0 else None
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._local.depth = depth
+            if profiler is not None:
+                profiler.disable()
+            event = {
+                'name': name,
+                'ts': (start - self._origin) * 1e6,
+                'dur': (end - start) * 1e6,
+                'tid': threading.get_ident(),
+                'thread': threading.current_thread().name,
+            }
+            if args:
+                event['args'] = {key: str(value) for key, value in args.items()}
+            with self._lock:
+                self._events.append(event)
+
+    def _start_profile(self) -> Optional[cProfile.Profile]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this interpreter
+            return None
+        with self._lock:
+            self._profiles.append(profiler)
+        return profiler
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-stage count, total and percentiles in seconds"""
+        with self._lock:
+            events = list(self._events)
+        durations: Dict[str, List[float]] = {}
+        for event in events:
+            durations.setdefault(event['name'], []).append(event['dur'] / 1e6)
+        return {
+            name: {
+                'count': len(values),
+                'total': sum(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'max': max(values),
+            }
+            for name, values in sorted(durations.items(), key=lambda item: -sum(item[1]))
+        }
+
+    def log_summary(self):
+        for name, stats in self.summary().items():
+            logger.info(
+                f"{name}: {stats['count']} spans, total {stats['total']:.2f}s, "
+                f"p50 {stats['p50'] * 1000:.0f}ms, p95 {stats['p95'] * 1000:.0f}ms, "
+                f"p99 {stats['p99'] * 1000:.0f}ms"
+            )
+
+    def export_chrome_trace(self, path: str):
+        """Write spans in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        with self._lock:
+            events = list(self._events)
+        pid = os.getpid()
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread}}
+            for tid, thread in {event['tid']: event['thread'] for event in events}.items()
+        ]
+        for event in events:
+            trace_event = {
+                'name': event['name'],
+                'cat': event['name'].split('.')[0],
+                'ph': 'X',
+                'ts': round(event['ts'], 1),
+                'dur': round(event['dur'], 1),
+                'pid': pid,
+                'tid': event['tid'],
+            }
+            if 'args' in event:
+                trace_event['args'] = event['args']
+            trace_events.append(trace_event)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+        logger.info(f"Saved trace with {len(events)} spans to {path}")
+
+    def dump_profile(self, path: str):
+        """Merge the cProfile runs of all threads into one pstats file"""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        logger.info(f"Saved profile of {len(profiles)} top-level spans to {path}")
+
+
+# Shared by every module, like the logging module's root logger
+tracer = Tracer()
+
+
+def span(name: str, **args):
+    """Time a block as a stage of the shared tracer"""
+    return tracer.span(name, **args)